@@ -0,0 +1,181 @@
+"""
+Benchmarks for catalog loading, search/filtering and visit analytics.
+
+    $ python -m benchmarks.run run --output benchmarks/baseline.json
+    $ python -m benchmarks.run run --output benchmarks/current.json
+    $ python -m benchmarks.run compare benchmarks/baseline.json benchmarks/current.json
+
+``compare`` exits with status 1 when a benchmark got slower than the threshold.
+Everything runs on the in-memory storage backend, no Firebase project is needed.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.synthetic import generate_games, generate_visits
+from catalog_replica import CatalogReplica
+from game_catalog import GameCatalog
+from pages.view_games import search_and_filter_games
+from storage.memory import MemoryClient
+from storage.repositories import Repository
+from utils.game_columns import GameColumns, get_game_columns
+from utils.search_index import GameSearchIndex
+from utils.visit_analytics import visit_breakdowns
+
+SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.25  # 25% slower than the baseline is flagged
+# (label, search_and_filter_games keyword arguments)
+FILTER_CASES = [
+    ("no-filters", {"search_term": ""}),
+    ("term", {"search_term": "bluff"}),
+    ("short-term", {"search_term": "ka"}),
+    ("accented-term", {"search_term": "cafe"}),
+    ("structured", {"search_term": "", "difficulty": "Medium", "min_players": 4, "max_players": 4}),
+    ("all-filters", {"search_term": "draw", "difficulty": "Easy", "min_players": 3, "max_players": 3,
+                     "drinking_only": True, "max_age": 12, "max_duration": 60}),
+]
+
+
+def measure(function, repeat):
+    """Run ``function`` ``repeat`` times, return the timings in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _record(results, name, timings):
+    results[name] = {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "runs": len(timings)
+    }
+    print(f"{name:<55} {results[name]['median'] * 1000:10.2f} ms")
+
+
+def bench_catalog_load(results, games, repeat):
+    db = MemoryClient()
+    repository = Repository(db)
+    repository.games.add_many({game['id']: {k: v for k, v in game.items() if k != 'id'} for game in games})
+
+    def load():
+        catalog = GameCatalog(lambda: repository.games)
+        catalog.search_index = GameSearchIndex()
+        catalog.add_observer(catalog.search_index.update)
+        catalog.start()
+        catalog.wait_until_ready()
+        catalog.stop()
+
+    _record(results, f"catalog/load/n={len(games)}", measure(load, repeat))
+    _record(results, f"catalog/columns/n={len(games)}", measure(lambda: GameColumns(games), repeat))
+
+    def build_replica():
+        CatalogReplica().update(games, [], True)
+
+    _record(results, f"catalog/replica-build/n={len(games)}", measure(build_replica, repeat))
+
+
+def bench_search(results, games, repeat):
+    games = tuple(games)
+    get_game_columns(games)  # Built once per catalog snapshot in the app as well
+    search_index = GameSearchIndex()
+    search_index.update(games, [], True)
+    replica = CatalogReplica()
+    replica.update(games, [], True)
+
+    engines = {"scan": {}, "index": {"search_index": search_index}, "replica": {"replica": replica}}
+    for engine, engine_args in engines.items():
+        for label, filter_args in FILTER_CASES:
+            def run():
+                search_and_filter_games(games, **filter_args, **engine_args)
+            _record(results, f"search/{engine}/{label}/n={len(games)}", measure(run, repeat))
+
+
+def bench_visits(results, size, repeat):
+    timestamps, is_admin, start_date, end_date = generate_visits(size)
+    _record(results, f"visits/breakdowns/n={size}",
+            measure(lambda: visit_breakdowns(timestamps, is_admin, start_date, end_date), repeat))
+
+
+def run(sizes, repeat, output):
+    results = {}
+    for size in sizes:
+        games = generate_games(size)
+        # Fewer repetitions on the biggest catalogs keep a full run short
+        size_repeat = max(1, repeat // 5) if size >= 100_000 else repeat
+        bench_catalog_load(results, games, max(1, size_repeat // 2))
+        bench_search(results, games, size_repeat)
+        bench_visits(results, size, size_repeat)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results
+    }
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {output}")
+
+
+def compare(baseline_path, current_path, threshold):
+    """Print the change of every benchmark, return the names of the ones that regressed"""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    with open(current_path, encoding="utf-8") as current_file:
+        current = json.load(current_file)["results"]
+
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name]["median"], current[name]["median"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  SLOWER"
+        print(f"{name:<55} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  {change:+7.1%}{flag}")
+
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<55} missing from {current_path}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GameBase benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save the results")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="catalog and visit log sizes")
+    run_parser.add_argument("--repeat", type=int, default=10, help="repetitions per benchmark")
+    run_parser.add_argument("--output", default="benchmarks/results.json", help="JSON file for the results")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="flag benchmarks whose median got slower by more than this fraction")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.repeat, args.output)
+        return 0
+
+    regressions = compare(args.baseline, args.current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
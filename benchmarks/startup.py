@@ -0,0 +1,105 @@
+"""
+Time to first render of ``streamlit_app.py`` for an anonymous visitor.
+
+    $ python -m benchmarks.startup --output benchmarks/startup-baseline.json
+    $ python -m benchmarks.startup --output benchmarks/startup-current.json
+    $ python -m benchmarks.run compare benchmarks/startup-baseline.json benchmarks/startup-current.json
+
+Every run starts a fresh interpreter, so no module is imported yet, and renders
+the default page with Streamlit's ``AppTest`` on the in-memory storage backend.
+The report also lists which heavy modules the first render loaded.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+# Modules an anonymous visitor of the game list should not need
+HEAVY_MODULES = ("workers", "pandas", "firebase_admin", "login", "pages.settings", "pages.change_database")
+
+
+def render_once():
+    """Render the app once in this (fresh) interpreter, return the timings and loaded modules"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    first_render = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+
+    loaded = [name for name in HEAVY_MODULES
+              if any(module == name or module.startswith(name + ".") for module in sys.modules)]
+    return {"first_render": first_render, "rerun": rerun, "loaded": loaded}
+
+
+def measure_startup(repeat):
+    # Imported here: benchmarks.run loads the app modules, which must stay out of the measured interpreters
+    from benchmarks.run import _record
+
+    results, loaded = {}, set()
+    timings = {"startup/process": [], "startup/first-render": [], "startup/rerun": []}
+    with tempfile.TemporaryDirectory() as scratch:
+        environment = {
+            **os.environ,
+            "GAMEBASE_STORAGE_BACKEND": "memory",
+            # Keep the snapshot and the metrics export out of data/
+            "GAMEBASE_CATALOG_SNAPSHOT": os.path.join(scratch, "catalog_snapshot.jsonl.gz"),
+            "GAMEBASE_METRICS_PATH": os.path.join(scratch, "metrics.json"),
+        }
+        for _ in range(repeat):
+            start = time.perf_counter()
+            child = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child"], env=environment,
+                                   capture_output=True, text=True)
+            if child.returncode:
+                raise RuntimeError(f"The app failed to render:\n{child.stderr}")
+            timings["startup/process"].append(time.perf_counter() - start)
+            run = json.loads(child.stdout.strip().splitlines()[-1])
+            timings["startup/first-render"].append(run["first_render"])
+            timings["startup/rerun"].append(run["rerun"])
+            loaded.update(run["loaded"])
+
+    for name, values in timings.items():
+        _record(results, name, values)
+    return results, sorted(loaded)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GameBase time to first render")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--output", default="benchmarks/startup.json", help="JSON file for the results")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(render_once()))
+        return 0
+
+    results, loaded = measure_startup(args.repeat)
+    print(f"Heavy modules loaded by the first render: {', '.join(loaded) or 'none'}")
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "loaded_modules": loaded,
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Synthetic, reproducible data for the benchmarks.
+
+The same ``size`` and ``seed`` always produce the same games and visits, so
+timings of different runs are measured on identical data.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from utils.game_records import DIFFICULTIES, build_game_record
+
+GAME_TYPES = ["Card Game", "Board Game", "Puzzle Game", "Adventure Game", "Party Game", "Other"]
+SYLLABLES = ["ka", "lo", "mi", "ra", "zen", "tor", "bel", "qui", "dra", "pix", "nor", "vel", "sha", "mon", "trik"]
+WORDS = [
+    "cards", "dice", "team", "guess", "draw", "score", "round", "turn", "bluff", "trade", "race", "word",
+    "answer", "steal", "collect", "match", "timer", "points", "secret", "vote", "build", "tile", "coin",
+    "café", "rôle", "drink"
+]
+MATERIALS = ["Deck of cards", "Dice", "Paper", "Pencils", "Timer", "Coins", "Tokens", "Board", "Cups"]
+
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def generate_games(size, seed=0):
+    """``size`` games shaped like the add game form stores them, with document ids"""
+    rng = random.Random(seed)
+    games = []
+    for number in range(size):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        min_players = rng.randint(1, 6)
+        game = build_game_record(
+            game_name=f"{name} {number}",
+            game_type=rng.choice(GAME_TYPES),
+            difficulty=rng.choice(DIFFICULTIES),
+            min_players=min_players,
+            max_players=min_players + rng.randint(0, 10),
+            min_age=rng.choice([4, 6, 8, 10, 12, 16, 18]),
+            min_duration=rng.choice([15, 30, 45, 60, 90, 120]),
+            materials=rng.sample(MATERIALS, rng.randint(1, 3)),
+            game_explanation=_sentence(rng, 12),
+            rules=_sentence(rng, 40),
+            example=_sentence(rng, 20),
+            drinking_rules=_sentence(rng, 8) if rng.random() < 0.1 else "",
+            created_at="2024-01-01T00:00:00+00:00",
+            created_by="benchmark"
+        )
+        game['id'] = f"game{number:07d}"
+        games.append(game)
+    return games
+
+
+def generate_visits(size, days=30, seed=0, end=None):
+    """``(timestamps, is_admin, start_date, end_date)`` of ``size`` visits spread over ``days`` days"""
+    rng = random.Random(seed)
+    end = end or datetime(2024, 6, 30, tzinfo=timezone.utc)
+    start = datetime(end.year, end.month, end.day, tzinfo=timezone.utc) - timedelta(days=days - 1)
+    span = days * 86400
+    timestamps = [(start + timedelta(seconds=rng.randrange(span))).isoformat() for _ in range(size)]
+    is_admin = [rng.random() < 0.05 for _ in range(size)]
+    return timestamps, is_admin, start.date(), end.date()
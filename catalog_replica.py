@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+import streamlit as st
+from utils.search_index import fold_text
+from utils.game_columns import DEFAULT_MIN_PLAYERS, DEFAULT_MAX_PLAYERS
+
+# Long text fields are indexed too, the name weighs most in the ranking
+FTS_FIELDS = ('game_name', 'game_type', 'game_explanation', 'rules', 'example', 'materials')
+FTS_WEIGHTS = (10.0, 2.0, 1.0, 0.5, 0.5, 1.0)
+MIN_MATCH_LENGTH = 3  # the trigram tokenizer needs at least three characters
+
+
+def replica_enabled():
+    """True when ``engine = "sqlite"`` is set in the ``[search]`` secrets or GAMEBASE_SEARCH_ENGINE"""
+    try:
+        config = dict(st.secrets.get("search", {}))
+    except Exception:
+        config = {}
+    return os.environ.get("GAMEBASE_SEARCH_ENGINE", config.get("engine", "index")) == "sqlite"
+
+
+def _number(value, default):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return default
+
+
+def _fts_values(game):
+    materials = game.get('materials', [])
+    if isinstance(materials, list):
+        materials = " | ".join(material for material in materials if isinstance(material, str))
+    values = {field: game.get(field) for field in FTS_FIELDS}
+    values['materials'] = materials
+    # Folded like the search box input, so accents don't matter
+    return [fold_text(value) if isinstance(value, str) else "" for value in values.values()]
+
+
+class CatalogReplica:
+    """Local SQLite read replica of the games catalog with an FTS5 trigram index.
+
+    The replica follows the game catalog (and so the Firestore change stream)
+    through ``update``. ``search`` evaluates the text match and every structured
+    filter in a single SQL query, ranked with bm25 when there is a search term.
+    """
+
+    def __init__(self, path=":memory:"):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(f"""
+            DROP TABLE IF EXISTS games;
+            DROP TABLE IF EXISTS games_fts;
+            CREATE TABLE games (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                min_players REAL,
+                max_players REAL,
+                min_age REAL,
+                min_duration REAL,
+                difficulty TEXT,
+                drinking INTEGER
+            );
+            CREATE VIRTUAL TABLE games_fts USING fts5({", ".join(FTS_FIELDS)}, tokenize='trigram');
+        """)
+
+    def update(self, upserts, removed_ids, full=False):
+        """Apply catalog changes, ``full`` replaces the whole replica"""
+        with self._lock, self._connection:
+            if full:
+                self._connection.execute("DELETE FROM games")
+                self._connection.execute("DELETE FROM games_fts")
+            for game_id in removed_ids:
+                self._remove(game_id)
+            for game in upserts:
+                if game.get('id') is None:
+                    continue
+                self._remove(game['id'])
+                explanation = game.get('game_explanation') or ''
+                drinking_rules = game.get('drinking_rules') or ''
+                cursor = self._connection.execute(
+                    "INSERT INTO games (id, min_players, max_players, min_age, min_duration, difficulty, drinking) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        game['id'],
+                        _number(game.get('min_players'), DEFAULT_MIN_PLAYERS),
+                        _number(game.get('max_players'), DEFAULT_MAX_PLAYERS),
+                        _number(game.get('min_age'), 0),
+                        _number(game.get('min_duration'), 0),
+                        game.get('difficulty'),
+                        "drink" in explanation.lower() or bool(drinking_rules.strip())
+                    )
+                )
+                self._connection.execute(
+                    f"INSERT INTO games_fts (rowid, {', '.join(FTS_FIELDS)}) VALUES (?{', ?' * len(FTS_FIELDS)})",
+                    [cursor.lastrowid] + _fts_values(game)
+                )
+
+    def _remove(self, game_id):
+        row = self._connection.execute("SELECT rowid FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row:
+            self._connection.execute("DELETE FROM games_fts WHERE rowid = ?", row)
+            self._connection.execute("DELETE FROM games WHERE rowid = ?", row)
+
+    def search(self, search_term=None, difficulty=None, min_players=None, max_players=None, drinking_only=False,
+               max_age=None, max_duration=None):
+        """Ids of the matching games, best text matches first"""
+        joins, conditions, params = [], [], []
+        order_by = "g.id"
+
+        term = fold_text(search_term) if search_term else ""
+        if term:
+            joins.append("JOIN games_fts ON games_fts.rowid = g.rowid")
+            if len(term) >= MIN_MATCH_LENGTH:
+                conditions.append("games_fts MATCH ?")
+                params.append('"' + term.replace('"', '""') + '"')
+                order_by = f"bm25(games_fts, {', '.join(str(weight) for weight in FTS_WEIGHTS)}), g.id"
+            else:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append("(" + " OR ".join(f"games_fts.{field} LIKE ? ESCAPE '\\'" for field in FTS_FIELDS) + ")")
+                params.extend([pattern] * len(FTS_FIELDS))
+
+        if difficulty and difficulty != "All":
+            conditions.append("g.difficulty = ?")
+            params.append(difficulty)
+        for player_count in (min_players, max_players):
+            if player_count is not None:
+                conditions.append("g.min_players <= ? AND ? <= g.max_players")
+                params.extend([player_count, player_count])
+        if drinking_only:
+            conditions.append("g.drinking")
+        if max_age is not None:
+            conditions.append("g.min_age <= ?")
+            params.append(max_age)
+        if max_duration is not None:
+            conditions.append("g.min_duration <= ?")
+            params.append(max_duration)
+
+        query = f"SELECT g.id FROM games g {' '.join(joins)}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_by}"
+
+        with self._lock:
+            return [row[0] for row in self._connection.execute(query, params)]
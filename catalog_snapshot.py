@@ -0,0 +1,93 @@
+import atexit
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+SNAPSHOT_PATH = os.environ.get("GAMEBASE_CATALOG_SNAPSHOT", "data/catalog_snapshot.jsonl.gz")
+SNAPSHOT_FORMAT = 1
+SAVE_INTERVAL = 30  # seconds between saves of a changed catalog
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _decode(obj):
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Return ``(games, watermark, full_synced_at)`` from the snapshot file, or Nones if there is none.
+
+    The file is gzip-compressed JSONL: a header line with the sync watermark
+    and the time of the last full sync, then one game per line.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+            header = json.loads(next(snapshot_file), object_hook=_decode)
+            if header.get("format") != SNAPSHOT_FORMAT:
+                return None, None, None
+            games = [json.loads(line, object_hook=_decode) for line in snapshot_file]
+        return games, header.get("watermark"), header.get("full_synced_at")
+    except (OSError, ValueError, StopIteration) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Ignoring unreadable catalog snapshot {path}: {e}")
+        return None, None, None
+
+
+def save_snapshot(games, watermark, path=SNAPSHOT_PATH, full_synced_at=None):
+    """Write the snapshot atomically, a crash never leaves a half-written file behind."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as snapshot_file:
+        header = {"format": SNAPSHOT_FORMAT, "watermark": watermark, "full_synced_at": full_synced_at,
+                  "count": len(games)}
+        snapshot_file.write(json.dumps(header, default=_encode) + "\n")
+        for game in games:
+            snapshot_file.write(json.dumps(game, default=_encode, ensure_ascii=False) + "\n")
+    os.replace(temporary_path, path)
+
+
+class SnapshotWriter:
+    """Saves the catalog to disk in the background whenever it has changed.
+
+    Saves are spaced ``SAVE_INTERVAL`` seconds apart and a final save runs when
+    the process exits.
+    """
+
+    def __init__(self, catalog, path=SNAPSHOT_PATH):
+        self._catalog = catalog
+        self._path = path
+        # Nothing is known to be on disk yet: the first save writes the current catalog, changed or not
+        self._saved_version = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="catalog-snapshot-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save(self):
+        games, watermark, full_synced_at, version = self._catalog.snapshot_state()
+        if version == self._saved_version or watermark is None:
+            return
+        try:
+            save_snapshot(games, watermark, self._path, full_synced_at=full_synced_at)
+            self._saved_version = version
+        except OSError as e:
+            print(f"Could not save catalog snapshot: {e}")
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join(timeout=SAVE_INTERVAL)
+        self.save()
+
+    def _run(self):
+        while not self._stopped.wait(SAVE_INTERVAL):
+            self.save()
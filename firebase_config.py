@@ -34,7 +34,9 @@ def get_firebase_app():
     return firebase_admin.get_app()
 
 # Get Firestore database instance
+@st.cache_resource
 def get_firestore_db():
-    """Get Firestore database instance"""
+    """Get the Firestore client, created once per process and shared by all sessions"""
     app = get_firebase_app()
     return firestore.client(app)
+
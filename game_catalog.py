@@ -0,0 +1,309 @@
+import threading
+import time
+import streamlit as st
+from storage import get_repository, storage_config
+from utils.search_index import GameSearchIndex
+from catalog_replica import CatalogReplica, replica_enabled
+from catalog_snapshot import SnapshotWriter, load_snapshot
+
+# How long the first page load waits for the initial listener snapshot
+INITIAL_LOAD_TIMEOUT = 15  # seconds
+# Minimum time between two attempts to restart a dead listener
+RECONNECT_INTERVAL = 30  # seconds
+# A listener that delivered nothing for this long is restarted, to prove Firestore is still reachable
+RESYNC_INTERVAL = 300  # seconds
+# Delta syncs miss games deleted or edited outside the app (no tombstone, no updated_at bump),
+# so the whole collection is read again once the last full sync is older than this
+FULL_RESYNC_INTERVAL = 6 * 3600  # seconds
+# A (re)started listener whose first snapshot is this late counts as unreachable
+SYNC_TIMEOUT = INITIAL_LOAD_TIMEOUT  # seconds
+# After a failed start, reruns fail fast for this long instead of waiting INITIAL_LOAD_TIMEOUT again
+FAILURE_BACKOFF = 60  # seconds
+
+_failure_lock = threading.Lock()
+_last_failure = (0.0, None)  # (time.monotonic() of the failure, its exception)
+
+
+class GameCatalog:
+    """Process-wide copy of the games collection, kept fresh by a snapshot listener.
+
+    The first snapshot fills the catalog, later snapshots only patch the games
+    that changed. Readers get an immutable tuple that is swapped on every change,
+    so concurrent sessions share the same snapshot without copying it.
+
+    A catalog can start from a saved snapshot and its sync ``watermark`` (the
+    read time of the last applied listener snapshot). It then only listens to
+    games updated after the watermark, plus tombstones of games deleted after
+    it, instead of downloading the whole collection again; every
+    ``FULL_RESYNC_INTERVAL`` a full listener reconciles the catalog with the
+    collection, dropping games that are gone. Until Firestore
+    answers, and during an outage, the saved games are served as they are;
+    ``unreachable()`` tells when that is the case and ``sync_age()`` how old they are.
+    """
+
+    def __init__(self, game_repository_factory, games=None, watermark=None, full_synced_at=None):
+        # Resolved on every (re)start, so a broken connection can be retried later
+        self._game_repository_factory = game_repository_factory
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watches = []
+        self._resync = True
+        self._last_start = 0
+        self._start_failed = False
+        # time.monotonic() of the last start while its first snapshot has not arrived
+        self._sync_pending_since = None
+        self._docs = {game['id']: game for game in games or ()}
+        self._snapshot = ()
+        self._observers = []
+        self.version = 0
+        self.watermark = watermark
+        self.search_index = None
+        self.replica = None
+        # Wall clock time of the last listener snapshot, for a saved snapshot the time of its watermark
+        self.synced_at = watermark.timestamp() if hasattr(watermark, "timestamp") else None
+        # Wall clock time of the last full listener snapshot
+        self.full_synced_at = full_synced_at
+        self._full_sync = False
+        if games is not None:
+            self._publish([], [], True)
+            self._ready.set()
+
+    def start(self):
+        """Attach the Firestore listeners (again, if a previous one died)."""
+        self._last_start = time.monotonic()
+        self.stop()
+        with self._lock:
+            self._resync = True
+            self._sync_pending_since = time.monotonic()
+            since = self.watermark
+            self._full_sync = since is None or self.full_resync_due()
+        try:
+            game_repository = self._game_repository_factory()
+            if self._full_sync:
+                self._watches = [game_repository.watch(self._on_snapshot)]
+            else:
+                # Delta sync: only what changed or was deleted after the watermark
+                self._watches = [
+                    game_repository.watch(self._on_snapshot, since=since),
+                    game_repository.watch_tombstones(self._on_tombstones, since=since)
+                ]
+        except Exception:
+            self.stop()
+            self._start_failed = True
+            raise
+        self._start_failed = False
+
+    def stop(self):
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+
+    def wait_until_ready(self, timeout=INITIAL_LOAD_TIMEOUT):
+        if not self._ready.wait(timeout):
+            self.stop()
+            raise TimeoutError("Timed out waiting for the initial games snapshot")
+
+    def ensure_listening(self):
+        """Restart the listeners if Firestore closed them after an error, or if they went quiet.
+
+        A listener retrying through an outage stays active but delivers nothing,
+        so one silent for ``RESYNC_INTERVAL`` is restarted too: when Firestore is
+        reachable, the restart delivers a (delta) snapshot and ``sync_age`` drops.
+        """
+        active = self._watches and all(getattr(watch, "is_active", True) for watch in self._watches)
+        if active and self.sync_age() < RESYNC_INTERVAL and not self.full_resync_due():
+            return
+        interval = RESYNC_INTERVAL if active else RECONNECT_INTERVAL
+        if time.monotonic() - self._last_start >= interval:
+            try:
+                self.start()
+            except Exception as e:
+                print(f"Could not restart the games listener: {e}")
+
+    def full_resync_due(self):
+        """True when the catalog was never, or over ``FULL_RESYNC_INTERVAL`` ago, reconciled with the whole collection"""
+        return self.full_synced_at is None or time.time() - self.full_synced_at >= FULL_RESYNC_INTERVAL
+
+    def unreachable(self):
+        """True when Firestore did not answer: the last (re)start failed, the listeners
+        were closed, or the first snapshot since the last start is over ``SYNC_TIMEOUT`` late.
+
+        A listener that is merely quiet is not an outage, ``ensure_listening``
+        restarts it and only a restart that gets no answer counts.
+        """
+        if self._start_failed:
+            return True
+        if self._watches and not all(getattr(watch, "is_active", True) for watch in self._watches):
+            return True
+        pending_since = self._sync_pending_since
+        return pending_since is not None and time.monotonic() - pending_since > SYNC_TIMEOUT
+
+    def sync_age(self):
+        """Seconds since the games were last synced with Firestore, infinite if they never were"""
+        if self.synced_at is None:
+            return float("inf")
+        return max(0.0, time.time() - self.synced_at)
+
+    def games(self):
+        """Return the current catalog as an immutable tuple of game dicts.
+
+        The dicts are shared between sessions and must not be mutated.
+        """
+        return self._snapshot
+
+    def get(self, game_id):
+        return self._docs.get(game_id)
+
+    def patch(self, game_id, fields, update_time):
+        """Apply a write this process just committed, ahead of the listener
+
+        Ignored when the listener already delivered this or a newer version.
+        The listener later replaces the patched game with the stored document.
+        """
+        with self._lock:
+            game = self._docs.get(game_id)
+            if game is None or not _newer(update_time, game.get('update_time')):
+                return False
+            patched = {**game, **fields, 'update_time': update_time}
+            self._docs[game_id] = patched
+            self._publish([patched], [], False)
+            return True
+
+    def snapshot_state(self):
+        """Return ``(games, watermark, full_synced_at, version)`` consistently, for saving to disk"""
+        with self._lock:
+            return self._snapshot, self.watermark, self.full_synced_at, self.version
+
+    def add_observer(self, observer):
+        """Register ``observer(upserts, removed_ids, full)`` to follow catalog changes.
+
+        The observer is called once with the current games (``full=True``) and
+        then after every change, while the catalog lock is held.
+        """
+        with self._lock:
+            self._observers.append(observer)
+            observer(list(self._snapshot), [], True)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        # Runs on the listener thread: no Streamlit calls in here
+        with self._lock:
+            upserts, removed = [], []
+            if self._resync and self._full_sync:
+                # First snapshot of a full listener holds the whole collection, games not in it are gone
+                self._docs = {doc.id: _game_from_doc(doc) for doc in docs}
+                upserts = list(self._docs.values())
+                full = True
+                self._full_sync = False
+                self.full_synced_at = time.time()
+            elif self._resync:
+                # First snapshot of a delta listener holds every game changed since the watermark
+                for doc in docs:
+                    game = _game_from_doc(doc)
+                    self._docs[doc.id] = game
+                    upserts.append(game)
+                full = False
+            else:
+                for change in changes:
+                    doc = change.document
+                    if change.type.name == "REMOVED":
+                        if self._docs.pop(doc.id, None) is not None:
+                            removed.append(doc.id)
+                    else:
+                        game = _game_from_doc(doc)
+                        self._docs[doc.id] = game
+                        upserts.append(game)
+                full = False
+
+            self._resync = False
+            self._sync_pending_since = None
+            self.synced_at = time.time()
+            self._advance_watermark(read_time)
+            self._publish(upserts, removed, full)
+        self._ready.set()
+
+    def _on_tombstones(self, docs, changes, read_time):
+        with self._lock:
+            removed = []
+            for change in changes:
+                if change.type.name == "REMOVED":
+                    continue
+                tombstone = change.document.to_dict()
+                game = self._docs.get(tombstone.get("game_id"))
+                # A game re-created under the same id after the deletion stays
+                if game is not None and not _newer(game.get("updated_at"), tombstone.get("deleted_at")):
+                    del self._docs[tombstone["game_id"]]
+                    removed.append(tombstone["game_id"])
+            self.synced_at = time.time()
+            self._advance_watermark(read_time)
+            if removed:
+                self._publish([], removed, False)
+
+    def _advance_watermark(self, read_time):
+        if read_time is not None and (self.watermark is None or read_time > self.watermark):
+            self.watermark = read_time
+
+    def _publish(self, upserts, removed, full):
+        self._snapshot = tuple(self._docs[game_id] for game_id in sorted(self._docs))
+        self.version += 1
+        for observer in self._observers:
+            observer(upserts, removed, full)
+
+
+def _newer(updated_at, deleted_at):
+    return updated_at is not None and deleted_at is not None and updated_at > deleted_at
+
+
+def _game_from_doc(doc):
+    game_data = doc.to_dict()
+    game_data['id'] = doc.id  # Add the document ID as a field
+    # Firestore's last write time, the precondition for optimistic edits and deletes
+    game_data['update_time'] = doc.update_time
+    return game_data
+
+
+@st.cache_resource
+def get_game_catalog():
+    """Create the shared catalog once per server process.
+
+    With Firestore, the catalog starts from the on-disk snapshot when there is
+    one and keeps it saved. Without a snapshot, the first page load waits for
+    the initial listener snapshot. ``st.cache_resource`` does not cache a
+    failure, so the last one is re-raised for ``FAILURE_BACKOFF`` seconds.
+    """
+    global _last_failure
+    with _failure_lock:
+        failed_at, error = _last_failure
+    if error is not None and time.monotonic() - failed_at < FAILURE_BACKOFF:
+        raise error.with_traceback(None)
+    try:
+        return _create_game_catalog()
+    except Exception as e:
+        with _failure_lock:
+            _last_failure = (time.monotonic(), e)
+        raise
+
+
+def _create_game_catalog():
+    use_snapshot = storage_config()[0] == "firestore"
+    games, watermark, full_synced_at = load_snapshot() if use_snapshot else (None, None, None)
+
+    catalog = GameCatalog(lambda: get_repository().games, games=games, watermark=watermark,
+                          full_synced_at=full_synced_at)
+    catalog.search_index = GameSearchIndex()
+    catalog.add_observer(catalog.search_index.update)
+    if replica_enabled():
+        catalog.replica = CatalogReplica()
+        catalog.add_observer(catalog.replica.update)
+
+    try:
+        catalog.start()
+    except Exception as e:
+        if games is None:
+            raise
+        # Firestore is unreachable: serve the last good snapshot and retry later
+        print(f"Serving the saved catalog snapshot, Firestore is unavailable: {e}")
+    catalog.wait_until_ready()
+
+    if use_snapshot:
+        catalog.snapshot_writer = SnapshotWriter(catalog)
+    return catalog
@@ -1,105 +1,164 @@
+import threading
 import streamlit as st
-from firebase_config import get_firestore_db
+from google.api_core.exceptions import AlreadyExists
+from storage import get_repository
+from metrics import traced
 
-def setup_game_types():
-    """Initialize game types in Firebase if they don't exist"""
-    try:
-        db = get_firestore_db()
-        
-        # Default game types
-        default_types = [
-            {"name": "Card Game", "order": 1},
-            {"name": "Board Game", "order": 2},
-            {"name": "Puzzle Game", "order": 3},
-            {"name": "Adventure Game", "order": 4},
-            {"name": "Party Game", "order": 5},
-            {"name": "Other", "order": 6}
-        ]
-        
-        # Check if game_types collection exists and has documents
-        types_ref = db.collection("game_types")
-        existing_types = list(types_ref.limit(1).stream())
-        
-        if not existing_types:
-            # Add the default types
-            for game_type in default_types:
-                types_ref.add(game_type)
-            st.success("Game types initialized successfully!")
-        
+# Fixed ids: server processes seeding an empty collection at once cannot write them twice
+DEFAULT_TYPES = [
+    {"id": "card_game", "name": "Card Game", "order": 1},
+    {"id": "board_game", "name": "Board Game", "order": 2},
+    {"id": "puzzle_game", "name": "Puzzle Game", "order": 3},
+    {"id": "adventure_game", "name": "Adventure Game", "order": 4},
+    {"id": "party_game", "name": "Party Game", "order": 5},
+    {"id": "other", "name": "Other", "order": 6}
+]
+
+
+class GameTypeRegistry:
+    """Process-wide cache of the ``game_types`` collection, in display order.
+
+    The collection is read once, and the defaults are written in one batch
+    when it is empty. Types added, deleted or moved through the registry update
+    the cache right away. There is no expiry: changes made by another server
+    process show up after ``invalidate()`` or a restart.
+    """
+
+    def __init__(self, game_type_repository):
+        self._types_repo = game_type_repository
+        self._lock = threading.Lock()
+        # Held while loading, so concurrent first loads read (and seed) the collection once
+        self._load_lock = threading.Lock()
+        self._types = None
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._types is not None:
+                return self._types
+        with self._load_lock:
+            with self._lock:
+                if self._types is not None:
+                    return self._types
+            game_types = self._types_repo.list_ordered()
+            if not game_types:
+                try:
+                    self._types_repo.add_many(DEFAULT_TYPES)
+                except AlreadyExists:
+                    pass  # Seeded by another server process in the meantime
+                game_types = self._types_repo.list_ordered()
+            with self._lock:
+                self._types = game_types
+                return self._types
+
+    def list(self):
+        """Game types ordered by their order field, each with its document id"""
+        return [dict(game_type) for game_type in self._ensure_loaded()]
+
+    def add(self, name):
+        """Add a type at the end, returns False when the name already exists"""
+        game_types = self._ensure_loaded()
+        if any(game_type["name"] == name for game_type in game_types):
+            return False
+        order = max((game_type.get("order", 0) for game_type in game_types), default=0) + 1
+        type_id = self._types_repo.add(name, order)
+        with self._lock:
+            if self._types is not None:
+                self._types = self._types + [{"id": type_id, "name": name, "order": order}]
         return True
-    except Exception as e:
-        st.error(f"Error setting up game types: {e}")
-        return False
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+    def delete(self, type_id):
+        self._types_repo.delete(type_id)
+        with self._lock:
+            if self._types is not None:
+                self._types = [game_type for game_type in self._types if game_type["id"] != type_id]
+
+    def move(self, type_id, offset):
+        """Move a type ``offset`` places up (negative) or down, renumbering the orders in one batch"""
+        game_types = list(self._ensure_loaded())
+        index = next((i for i, game_type in enumerate(game_types) if game_type["id"] == type_id), None)
+        if index is None or not 0 <= index + offset < len(game_types):
+            return
+        game_types.insert(index + offset, game_types.pop(index))
+        game_types = [{**game_type, "order": order} for order, game_type in enumerate(game_types, start=1)]
+        self._types_repo.reorder({game_type["id"]: game_type["order"] for game_type in game_types})
+        with self._lock:
+            self._types = game_types
+
+    def invalidate(self):
+        """Reload the collection on the next lookup"""
+        with self._lock:
+            self._types = None
+
+
+@st.cache_resource
+def get_game_type_registry():
+    """Create the shared game type registry once per server process."""
+    return GameTypeRegistry(get_repository().game_types)
+
+
 def load_game_types():
-    """Fetch game types from Firestore database"""
+    """Game types from the shared registry"""
     try:
-        db = get_firestore_db()
-        types_ref = db.collection("game_types")
-        # Order by the order field
-        types_docs = types_ref.order_by("order").stream()
-        
-        game_types = []
-        for doc in types_docs:
-            type_data = doc.to_dict()
-            type_data['id'] = doc.id  # Add the document ID
-            game_types.append(type_data)
-            
-        return game_types
+        return get_game_type_registry().list()
     except Exception as e:
         st.error(f"Error loading game types: {e}")
         return []
-    
 
+
+@traced(page=True)
 def manage_game_types():
     """Section for managing game types"""
     st.subheader("Manage Game Types")
-    
-    # Initialize game types if needed
-    setup_game_types()
-    
-    # Load game types
+
+    registry = get_game_type_registry()
+
+    # Load game types, the defaults are added on first use
     game_types = load_game_types()
-    
+
     # Display existing game types
     st.write("Current Game Types:")
-    
+
     for i, game_type in enumerate(game_types):
-        col1, col2 = st.columns([3, 1])
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
         with col1:
             st.write(f"{i+1}. {game_type['name']}")
         with col2:
+            if st.button("↑", key=f"up_type_{game_type['id']}", disabled=i == 0):
+                try:
+                    registry.move(game_type['id'], -1)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error moving game type: {e}")
+        with col3:
+            if st.button("↓", key=f"down_type_{game_type['id']}", disabled=i == len(game_types) - 1):
+                try:
+                    registry.move(game_type['id'], 1)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error moving game type: {e}")
+        with col4:
             if game_type['name'] != "Other":  # Don't allow deleting "Other"
                 if st.button("Delete", key=f"del_type_{game_type['id']}"):
                     try:
-                        db = get_firestore_db()
-                        db.collection("game_types").document(game_type['id']).delete()
+                        registry.delete(game_type['id'])
                         st.success(f"Game type '{game_type['name']}' deleted!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Error deleting game type: {e}")
-    
+
     # Add new game type
     st.write("Add New Game Type:")
     with st.form("add_game_type_form"):
         new_type_name = st.text_input("Type Name")
         submitted = st.form_submit_button("Add Game Type")
-        
+
         if submitted and new_type_name:
             try:
                 # Check if this type already exists
-                if any(gt['name'] == new_type_name for gt in game_types):
+                if not registry.add(new_type_name):
                     st.error(f"Game type '{new_type_name}' already exists!")
                 else:
-                    # Add the new type
-                    db = get_firestore_db()
-                    new_order = max([gt.get('order', 0) for gt in game_types], default=0) + 1
-                    db.collection("game_types").add({
-                        "name": new_type_name,
-                        "order": new_order
-                    })
                     st.success(f"Game type '{new_type_name}' added!")
                     st.rerun()
             except Exception as e:
-                st.error(f"Error adding game type: {e}")
\ No newline at end of file
+                st.error(f"Error adding game type: {e}")
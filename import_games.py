@@ -0,0 +1,102 @@
+"""
+Bulk import of games from JSON, JSONL or CSV files.
+
+Rows are validated and built like the add game form stores them, and
+deduplicated on the normalized game name, both within the file and against the
+games already in the database. New games get a document id derived from their
+name and are written in parallel WriteBatches, so running the same import
+again writes nothing.
+
+    $ python import_games.py games.csv [more.jsonl ...] [--dry-run]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from storage import get_repository
+from utils.game_records import GAME_FIELDS, game_doc_id, game_record_from_row, normalize_game_name
+
+
+def read_games_file(path):
+    """Rows of a ``.json`` (a list, or ``{"games": [...]}``), ``.jsonl`` or ``.csv`` file"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig", newline="") as games_file:
+        if extension == ".csv":
+            return list(csv.DictReader(games_file))
+        if extension == ".jsonl":
+            return [json.loads(line) for line in games_file if line.strip()]
+        if extension == ".json":
+            data = json.load(games_file)
+            return data.get("games", []) if isinstance(data, dict) else data
+    raise ValueError(f"Unsupported file type '{extension}', use .json, .jsonl or .csv")
+
+
+def plan_import(rows, existing_names, created_by="import"):
+    """Work out which rows to write, without touching the database
+
+    ``existing_names`` is ``{document id: game_name}`` of the stored games.
+    Returns ``(games_by_id, report)``.
+    """
+    created_at = datetime.now(timezone.utc).isoformat()
+    taken_names = {normalize_game_name(name) for name in existing_names.values() if name}
+    report = {"rows": len(rows), "invalid": [], "duplicates": 0, "existing": 0, "ignored_fields": set()}
+    games_by_id = {}
+
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            report["invalid"].append((row_number, ["row is not an object"]))
+            continue
+        report["ignored_fields"].update(field for field in row if field not in GAME_FIELDS)
+        game, errors = game_record_from_row(row, created_at, created_by)
+        if errors:
+            report["invalid"].append((row_number, errors))
+            continue
+
+        name = normalize_game_name(game["game_name"])
+        game_id = game_doc_id(game["game_name"])
+        if name in taken_names or game_id in existing_names:
+            report["existing"] += 1
+        elif game_id in games_by_id:
+            report["duplicates"] += 1  # The first row with a name wins
+        else:
+            games_by_id[game_id] = game
+
+    report["ignored_fields"] = sorted(report["ignored_fields"])
+    report["new"] = len(games_by_id)
+    return games_by_id, report
+
+
+def import_games(rows, created_by="import", dry_run=False):
+    """Import game rows, returns the report of ``plan_import`` with the number of games ``written``"""
+    games_repo = get_repository().games
+    games_by_id, report = plan_import(rows, games_repo.list_names(), created_by)
+    report["written"] = 0 if dry_run else games_repo.add_many(games_by_id)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import games from JSON, JSONL or CSV files.")
+    parser.add_argument("files", nargs="+", help="files to import")
+    parser.add_argument("--dry-run", action="store_true", help="validate and report without writing")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for path in args.files:
+        rows.extend(read_games_file(path))
+
+    report = import_games(rows, dry_run=args.dry_run)
+    for row_number, errors in report["invalid"]:
+        print(f"Row {row_number} skipped: {'; '.join(errors)}")
+    if report["ignored_fields"]:
+        print(f"Ignored fields: {', '.join(report['ignored_fields'])}")
+    print(f"{report['rows']} rows: {report['new']} new games ({report['written']} written), "
+          f"{report['existing']} already in the database, {report['duplicates']} duplicates, "
+          f"{len(report['invalid'])} invalid")
+    return 1 if report["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
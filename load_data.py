@@ -1,22 +1,24 @@
-import pandas as pd
-import firebase_admin
-from firebase_admin import credentials, firestore
 import streamlit as st
-from firebase_config import get_firestore_db
+from game_catalog import get_game_catalog
+from metrics import traced
 
+@traced()
 def load_games():
-    """Fetch games from Firestore or fallback to CSV if Firebase is unavailable."""
+    """Return the shared game catalog, or fall back to demo games if Firebase is unavailable.
+
+    The catalog is loaded once per server process and kept up to date by a
+    Firestore listener, so this does not hit the network on a rerun.
+    """
     try:
-        # Try to connect to Firestore and fetch the games
-        db = get_firestore_db()
-        games_ref = db.collection("games")
-        games_docs = games_ref.stream()
-        
-        games = []
-        for doc in games_docs:
-            game_data = doc.to_dict()
-            game_data['id'] = doc.id  # Add the document ID as a field
-            games.append(game_data)
+        catalog = get_game_catalog()
+        catalog.ensure_listening()
+        games = catalog.games()
+        if catalog.unreachable():
+            sync_age = catalog.sync_age()
+            if sync_age == float("inf"):
+                st.warning("Firebase is unreachable, showing the last saved copy of the games.")
+            else:
+                st.warning(f"Firebase is unreachable, showing the games as of {sync_age // 60:.0f} minutes ago.")
         
         # If Firebase is successful
         st.session_state['firebase_initialized'] = True
@@ -28,6 +30,33 @@ def load_games():
         st.info("Falling back to CSV demo data...")
         return load_demo_games()
 
+def patch_game(game_id, fields, update_time):
+    """Show a saved edit in the shared catalog right away, without reloading it."""
+    if not st.session_state.get('firebase_initialized'):
+        return
+    try:
+        get_game_catalog().patch(game_id, fields, update_time)
+    except Exception as e:
+        print(f"Could not patch game {game_id} in the catalog: {e}")
+
+def load_search_index():
+    """Return the search index of the shared catalog, or None when serving demo games."""
+    if not st.session_state.get('firebase_initialized'):
+        return None
+    try:
+        return get_game_catalog().search_index
+    except Exception:
+        return None
+
+def load_catalog_replica():
+    """Return the SQLite read replica of the shared catalog, or None when it is disabled."""
+    if not st.session_state.get('firebase_initialized'):
+        return None
+    try:
+        return get_game_catalog().replica
+    except Exception:
+        return None
+
 def load_demo_games():
     """Load demo games from a CSV file"""
     try:
@@ -1,21 +1,27 @@
+import math
 import streamlit as st
-import bcrypt
-from firebase_config import get_firestore_db
-from google.cloud.firestore_v1 import FieldFilter
-from datetime import datetime, timezone
-datetime.now(timezone.utc).isoformat()
+from storage import get_repository
+from user_directory import get_user_directory
+from visit_log import get_visit_recorder
+from workers import run_in_background, verify_password
+from login_limiter import get_login_limiter
+from session_tokens import remember_login, restore_login
+from metrics import traced
 
 
+@traced()
 def check_login():
     """Check if the user is logged in using Firestore + bcrypt, with UI placeholders."""
 
-    db = get_firestore_db()
-    users_ref = db.collection("users")
-
     # Return early if already logged in
     if "logged_in" in st.session_state and st.session_state["logged_in"]:
         return True
 
+    # A signed token in the URL restores the login without a lookup or bcrypt check
+    if restore_login():
+        update_visit_log_after_login()
+        return True
+
     # Create UI placeholders
     username_placeholder = st.empty()
     password_placeholder = st.empty()
@@ -28,18 +34,27 @@ def check_login():
 
     if login_button:
         try:
-            docs = users_ref.where(filter=FieldFilter("username", "==", username)).limit(1).stream()
-            user_doc = next(docs, None)
+            limiter = get_login_limiter()
+            retry_after = limiter.admit(st.session_state.get("anonymous_id", "unknown"), username)
+            if retry_after:
+                st.warning(f"Too many login attempts. Please try again in {math.ceil(retry_after)} seconds.")
+                return False
+
+            user = get_user_directory().get(username)
 
-            if not user_doc:
+            if not user:
                 log_login_attempt(username, success=False)
                 st.error("Invalid username or password.")
                 return False
 
-            user = user_doc.to_dict()
-            stored_hash = user["password_hash"].encode()
+            # Hash check on the bounded bcrypt pool, logging happens in the background
+            with limiter.verification_slot() as acquired:
+                if not acquired:
+                    st.warning("The server is busy. Please try again in a few seconds.")
+                    return False
+                password_ok = verify_password(password, user["password_hash"])
 
-            if bcrypt.checkpw(password.encode(), stored_hash):
+            if password_ok:
                 # Login successful
                 st.session_state["logged_in"] = True
                 st.session_state["username"] = username
@@ -52,6 +67,7 @@ def check_login():
 
                 log_login_attempt(username, success=True)
                 update_visit_log_after_login()
+                remember_login(user)
 
                 return True
             else:
@@ -65,59 +81,18 @@ def check_login():
 
 
 def log_login_attempt(username, success):
-    try:
-        db = get_firestore_db()
-        session_id = st.session_state.get("anonymous_id", "unknown")
-        today_str = datetime.now(timezone.utc).date().isoformat()
-
-        attempts_ref = db.collection("login_attempts")
-
-        # Look for existing attempt for this session today
-        existing_logs = attempts_ref \
-            .where(filter=FieldFilter("session_id", "==", session_id)) \
-            .where(filter=FieldFilter("date", "==", today_str)) \
-            .limit(1) \
-            .stream()
-
-        for doc in existing_logs:
-            doc.reference.update({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "username": username,
-                "success": success,
-                "tries": doc.to_dict().get("tries", 1) + 1
-            })
-            return
-
-        # If not found, create new log entry
-        attempts_ref.add({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "username": username,
-            "success": success,
-            "session_id": session_id,
-            "date": today_str,
-            "tries": 1
-        })
-
-    except Exception as e:
-        st.warning(f"Could not log login attempt: {e}")
+    """Record the attempt in the background, the page does not wait for Firestore"""
+    session_id = st.session_state.get("anonymous_id", "unknown")
+    logs = get_repository().logs
+    run_in_background(logs.log_login_attempt, session_id, username, success)
 
 
 
 
 def update_visit_log_after_login():
-    db = get_firestore_db()
+    """Attach the login to today's visit log in the background"""
     session_id = st.session_state.get("anonymous_id", "unknown")
-    today_str = datetime.now(timezone.utc).date().isoformat()
-
-    logs = db.collection("visit_logs") \
-        .where(filter=FieldFilter("session_id", "==", session_id)) \
-        .where(filter=FieldFilter("date", "==", today_str)) \
-        .limit(1) \
-        .stream()
-
-    for doc in logs:
-        doc.reference.update({
-            "username": st.session_state.get("username", "unknown"),
-            "is_admin": st.session_state.get("admin_user_rights", False)
-        })
-        break  # Only update the first match
\ No newline at end of file
+    username = st.session_state.get("username", "unknown")
+    is_admin = st.session_state.get("admin_user_rights", False)
+
+    run_in_background(get_visit_recorder().mark_login, session_id, username, is_admin)
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import streamlit as st
+from storage import get_repository
+from workers import BCRYPT_WORKERS
+
+# Bursts of SESSION_BURST attempts per session, then one every SESSION_REFILL seconds
+SESSION_BURST = 5
+SESSION_REFILL = 30  # seconds per attempt
+# A username can be tried from many sessions, so it gets a larger burst but a slower refill
+USERNAME_BURST = 10
+USERNAME_REFILL = 60  # seconds per attempt
+# Password checks running or queued at once, for the whole process
+MAX_CONCURRENT_VERIFICATIONS = BCRYPT_WORKERS * 2
+VERIFICATION_WAIT = 2  # seconds a login waits for a free verification slot
+MAX_BUCKETS = 10_000  # least recently used buckets are forgotten beyond this
+
+
+class TokenBucket:
+    """Allows ``capacity`` attempts at once, refilled with one attempt every ``refill_seconds``"""
+
+    def __init__(self, capacity, refill_seconds, tokens=None, now=None):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.tokens = capacity if tokens is None else max(0.0, min(capacity, tokens))
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.refill_seconds)
+        self.updated = now
+
+    def retry_after(self, now):
+        """Seconds until an attempt is allowed, 0 when one is allowed now"""
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) * self.refill_seconds
+
+    def take(self):
+        self.tokens -= 1
+
+
+def _seeded_tokens(entries, capacity, refill_seconds):
+    """Tokens left after today's recorded ``login_attempts`` entries, refilled since the last one"""
+    tries = sum(entry.get("tries", 0) for entry in entries)
+    if not tries:
+        return capacity
+    last_attempt = max((entry.get("timestamp") or "" for entry in entries), default="")
+    try:
+        elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(last_attempt)).total_seconds()
+    except (TypeError, ValueError):
+        elapsed = 0
+    return capacity - tries + max(0, elapsed) / refill_seconds
+
+
+class LoginLimiter:
+    """Admission control for the login form, shared by every session of the process.
+
+    Every attempt takes a token from the bucket of its session and of the
+    username it tries. A bucket seen for the first time is seeded from the
+    tries already recorded in today's ``login_attempts``, so restarting the
+    server does not reset the limits. Password checks additionally need one of
+    ``MAX_CONCURRENT_VERIFICATIONS`` slots, so a burst of attempts cannot take
+    every core away from the other sessions.
+    """
+
+    def __init__(self, log_repository):
+        self._logs = log_repository
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._verifications = threading.BoundedSemaphore(MAX_CONCURRENT_VERIFICATIONS)
+
+    def _bucket(self, key, capacity, refill_seconds, load_entries):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets.move_to_end(key)
+                return bucket
+
+        # Outside the lock: seeding reads Firestore
+        try:
+            tokens = _seeded_tokens(load_entries(), capacity, refill_seconds)
+        except Exception as e:
+            print(f"Could not read login attempts for {key}: {e}")
+            tokens = capacity
+
+        with self._lock:
+            bucket = self._buckets.setdefault(key, TokenBucket(capacity, refill_seconds, tokens))
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+            return bucket
+
+    def admit(self, session_id, username):
+        """Take a token for the attempt, return 0 when admitted or the seconds to wait
+
+        The session bucket is checked first: a throttled session is turned away
+        before its username bucket is looked up, so cycling through usernames
+        costs no Firestore query and no bucket.
+        """
+        def session_entries():
+            entry = self._logs.session_login_attempts_today(session_id)
+            return [entry] if entry else []
+
+        buckets = [self._bucket(("session", session_id), SESSION_BURST, SESSION_REFILL, session_entries)]
+        with self._lock:
+            retry_after = buckets[0].retry_after(time.monotonic())
+        if retry_after:
+            return retry_after
+
+        if username:
+            buckets.append(self._bucket(("username", username), USERNAME_BURST, USERNAME_REFILL,
+                                        lambda: self._logs.username_login_attempts_today(username)))
+
+        with self._lock:
+            now = time.monotonic()
+            retry_after = max(bucket.retry_after(now) for bucket in buckets)
+            if retry_after:
+                return retry_after
+            for bucket in buckets:
+                bucket.take()
+            return 0
+
+    @contextmanager
+    def verification_slot(self):
+        """Yield True while holding a password check slot, False when none freed up in time"""
+        acquired = self._verifications.acquire(timeout=VERIFICATION_WAIT)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._verifications.release()
+
+
+@st.cache_resource
+def get_login_limiter():
+    """Create the shared login limiter once per server process."""
+    return LoginLimiter(get_repository().logs)
@@ -0,0 +1,183 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
+import streamlit as st
+
+METRICS_PATH = os.environ.get("GAMEBASE_METRICS_PATH", "data/metrics.json")
+EXPORT_INTERVAL = 60  # seconds between exports of the aggregated metrics
+MAX_SAMPLES = 1000  # most recent samples kept per page and per span
+
+# Trace of the rerun running in the current script thread, None elsewhere
+_current_trace = contextvars.ContextVar("gamebase_trace", default=None)
+
+
+class RerunTrace:
+    """Timings and Firestore operation counts of a single rerun"""
+
+    def __init__(self, page):
+        self.page = page
+        self.reads = 0
+        self.writes = 0
+        self.spans = []
+
+
+class MetricsRegistry:
+    """Process-wide aggregation of rerun and span timings.
+
+    Keeps the most recent ``MAX_SAMPLES`` samples per page and per span and
+    exports the p50/p95 summary to ``METRICS_PATH`` every ``EXPORT_INTERVAL``
+    seconds and when the process exits.
+    """
+
+    def __init__(self, path=METRICS_PATH):
+        self._path = path
+        self._lock = threading.Lock()
+        self._reruns = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        self._spans = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self):
+        return self._path
+
+    def record_rerun(self, trace, duration):
+        with self._lock:
+            self._reruns[trace.page].append((duration, trace.reads, trace.writes))
+            for name, span_duration in trace.spans:
+                self._spans[name].append(span_duration)
+
+    def reset(self):
+        with self._lock:
+            self._reruns.clear()
+            self._spans.clear()
+
+    def summary(self):
+        """``{"pages": [...], "spans": [...]}`` with counts, p50/p95 latencies (ms) and operations per rerun"""
+        with self._lock:
+            reruns = {page: np.array(samples) for page, samples in self._reruns.items()}
+            spans = {name: np.array(samples) for name, samples in self._spans.items()}
+
+        pages = []
+        for page, samples in sorted(reruns.items()):
+            durations, reads, writes = samples[:, 0] * 1000, samples[:, 1], samples[:, 2]
+            pages.append({
+                "page": page,
+                "reruns": len(samples),
+                "p50_ms": float(np.percentile(durations, 50)),
+                "p95_ms": float(np.percentile(durations, 95)),
+                "reads_per_rerun": float(reads.mean()),
+                "writes_per_rerun": float(writes.mean()),
+                "max_reads": int(reads.max())
+            })
+        span_rows = [{
+            "span": name,
+            "calls": len(samples),
+            "p50_ms": float(np.percentile(samples * 1000, 50)),
+            "p95_ms": float(np.percentile(samples * 1000, 95))
+        } for name, samples in sorted(spans.items())]
+        return {"pages": pages, "spans": span_rows}
+
+    def export(self):
+        """Write the summary to ``METRICS_PATH`` atomically"""
+        report = {"exported_at": datetime.now(timezone.utc).isoformat(), **self.summary()}
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self._path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            json.dump(report, metrics_file, indent=2)
+        os.replace(temporary_path, self._path)
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join(timeout=EXPORT_INTERVAL)
+        self._safe_export()
+
+    def _safe_export(self):
+        try:
+            if self._reruns:
+                self.export()
+        except OSError as e:
+            print(f"Could not export metrics: {e}")
+
+    def _run(self):
+        while not self._stopped.wait(EXPORT_INTERVAL):
+            self._safe_export()
+
+
+@st.cache_resource
+def get_metrics():
+    """Create the shared metrics registry once per server process."""
+    return MetricsRegistry()
+
+
+@contextmanager
+def rerun_trace(page="unknown"):
+    """Trace a whole script run, the trace's page can be refined while it runs"""
+    trace = RerunTrace(page)
+    token = _current_trace.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        duration = time.perf_counter() - start
+        _current_trace.reset(token)
+        get_metrics().record_rerun(trace, duration)
+
+
+@contextmanager
+def span(name):
+    """Time a block of the current rerun, a no-op outside a rerun"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, time.perf_counter() - start))
+
+
+def traced(name=None, page=False, fragment=False):
+    """Decorator timing every call as a span
+
+    With ``page=True`` the rerun is attributed to this function; nested pages
+    (e.g. an admin subpage inside settings) take precedence over outer ones.
+    With ``fragment=True`` a call outside a script run, i.e. an ``st.fragment``
+    rerunning on its own, is recorded as a rerun of the page ``<name> (fragment)``.
+    """
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if fragment and trace is None:
+                with rerun_trace(f"{span_name} (fragment)"), span(span_name):
+                    return function(*args, **kwargs)
+            if page and trace is not None:
+                trace.page = span_name
+            with span(span_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_operations(reads=0, writes=0):
+    """Add Firestore operations to the current rerun, background threads are not counted"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.reads += reads
+        trace.writes += writes
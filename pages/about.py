@@ -1,5 +1,7 @@
 import streamlit as st
+from metrics import traced
 
+@traced(page=True)
 def about():
     """About the app"""
     st.subheader("About GameBase")
@@ -1,9 +1,12 @@
 import streamlit as st
-from firebase_config import get_firestore_db
+from storage import get_repository
 from game_types import load_game_types
+from utils.game_records import build_game_record, DIFFICULTIES
 from datetime import datetime, timezone
+from metrics import traced
 
 
+@traced(page=True)
 def add_game():
     """Form for adding a new game to the database"""
     st.subheader("Add New Game")
@@ -31,7 +34,7 @@ def add_game():
         game_type = st.selectbox("Game Type*", game_type_options, help="Select the type of game", key="game_type")
 
 
-        difficulty = st.selectbox("Difficulty*", ["Easy", "Medium", "Hard"], key="difficulty")
+        difficulty = st.selectbox("Difficulty*", DIFFICULTIES, key="difficulty")
         
         # Player information
         col1, col2 = st.columns(2)
@@ -98,39 +101,36 @@ def add_game():
         if submitted:
             try:
                 # Prepare game data
-                new_game = {
-                    'game_name': game_name,
-                    'game_type': game_type,
-                    'difficulty': difficulty,
-                    'min_players': min_players,
-                    'max_players': max_players,
-                    'min_age': min_age,
-                    'min_duration': min_duration,
-                    'materials': [item.strip().title() for item in materials.split(',') if item.strip()],
-                    'game_explanation': game_explanation,
-                    'rules': rules,
-                    'score_calculation': score_calculation,
-                    'example': example,
-                    'expansions': [item.strip().upper() for item in expansions.split(',') if item.strip()],
-                    'drinking_rules': drinking_rules,
-                    'to_be_updated': manual_flag,
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                    "created_by": st.session_state.get("username", "unknown"),
-                    'image_path': ""  # Empty for now, could be added later
-                }
+                new_game = build_game_record(
+                    game_name=game_name,
+                    game_type=game_type,
+                    difficulty=difficulty,
+                    min_players=min_players,
+                    max_players=max_players,
+                    min_age=min_age,
+                    min_duration=min_duration,
+                    materials=materials,
+                    game_explanation=game_explanation,
+                    rules=rules,
+                    score_calculation=score_calculation,
+                    example=example,
+                    expansions=expansions,
+                    drinking_rules=drinking_rules,
+                    to_be_updated=manual_flag,
+                    created_at=datetime.now(timezone.utc).isoformat(),
+                    created_by=st.session_state.get("username", "unknown"),
+                    image_path=""  # Empty for now, could be added later
+                )
                 
-                # Get Firestore database
-                db = get_firestore_db()
-                games_ref = db.collection("games")
+                games_repo = get_repository().games
                 
                 # Check if a game with this name already exists
-                existing_games = list(games_ref.where("game_name", "==", game_name).limit(1).stream())
-                if existing_games:
+                if games_repo.find_by_name(game_name):
                     st.session_state.add_status = "error_duplicate"
                     st.session_state.duplicate_game = game_name
                 else:
                     # Add the new game
-                    games_ref.add(new_game)
+                    games_repo.add(new_game)
                     st.session_state.add_status = "success"
                     st.session_state.added_game_name = game_name
             
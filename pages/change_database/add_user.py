@@ -1,7 +1,9 @@
 import streamlit as st
-import bcrypt
-from firebase_config import get_firestore_db
+from user_directory import get_user_directory
+from workers import hash_password
+from metrics import traced
 
+@traced(page=True)
 def add_user():
     st.subheader("Add New User")
 
@@ -16,25 +18,21 @@ def add_user():
                 st.error("Both username and password are required.")
                 return
 
-            db = get_firestore_db()
-            users_ref = db.collection("users")
+            directory = get_user_directory()
 
             # Check if user already exists
-            existing = list(users_ref.where("username", "==", username).limit(1).stream())
-            if existing:
+            if directory.get(username):
                 st.error("Username already exists.")
                 return
 
             try:
                 # Hash the password
-                hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-                # Add user
-                users_ref.add({
-                    "username": username,
-                    "password_hash": hashed_pw,
-                    "admin_user_rights": is_admin
-                })
+                hashed_pw = hash_password(password)
+
+                # Add user, the create fails if the username was taken in the meantime
+                if not directory.add(username, hashed_pw, is_admin):
+                    st.error("Username already exists.")
+                    return
 
                 st.success(f"User '{username}' added successfully!")
             except Exception as e:
@@ -1,15 +1,25 @@
+import importlib
 import streamlit as st
 
-from pages.change_database.add_game import add_game
-from pages.change_database.delete_game import delete_game
-from pages.change_database.edit_game import edit_game
-from pages.change_database.add_user import add_user
-from pages.change_database.remove_user import remove_user
-from pages.change_database.view_login_attempts import view_login_attempts
-from pages.change_database.view_visits import view_visits
+from metrics import traced
+from session_tokens import forget_login
 
+# db_page -> (module, page function), imported when the page is first opened
+DB_PAGES = {
+    'add': ("pages.change_database.add_game", "add_game"),
+    'edit': ("pages.change_database.edit_game", "edit_game"),
+    'delete': ("pages.change_database.delete_game", "delete_game"),
+    'add_user': ("pages.change_database.add_user", "add_user"),
+    'remove_user': ("pages.change_database.remove_user", "remove_user"),
+    'view_login_attempts': ("pages.change_database.view_login_attempts", "view_login_attempts"),
+    'view_visits': ("pages.change_database.view_visits", "view_visits"),
+    'view_performance': ("pages.change_database.view_performance", "view_performance"),
+    'view_game_history': ("pages.change_database.view_game_history", "view_game_history"),
+    'game_types': ("game_types", "manage_game_types"),
+}
 
 
+@traced(page=True)
 def change_database():
     """CRUD Page for managing games (Add, Edit, Delete) and users"""
 
@@ -23,7 +33,7 @@ def change_database():
             st.write("Select an action to manage your games or users.")
 
             # 🎮 Game management buttons
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col10 = st.columns(4)
             with col1:
                 if st.button("Add Game", use_container_width=True):
                     st.session_state.db_page = 'add'
@@ -36,6 +46,10 @@ def change_database():
                 if st.button("Delete Game", use_container_width=True):
                     st.session_state.db_page = 'delete'
                     st.rerun()
+            with col10:
+                if st.button("Game Types", use_container_width=True):
+                    st.session_state.db_page = 'game_types'
+                    st.rerun()
 
             # 👤 User management buttons
             st.markdown("---")
@@ -55,7 +69,7 @@ def change_database():
             st.markdown("---")
             st.subheader("Analytics")
 
-            col6, col7 = st.columns(2)
+            col6, col7, col8, col9 = st.columns(4)
             with col6:
                 if st.button("View Login Attempts", use_container_width=True):
                     st.session_state.db_page = 'view_login_attempts'
@@ -64,12 +78,23 @@ def change_database():
                 if st.button("View Visits", use_container_width=True):
                     st.session_state.db_page = 'view_visits'
                     st.rerun()
+            with col8:
+                if st.button("View Performance", use_container_width=True):
+                    st.session_state.db_page = 'view_performance'
+                    st.rerun()
+            with col9:
+                if st.button("View Edit History", use_container_width=True):
+                    st.session_state.db_page = 'view_game_history'
+                    st.rerun()
 
         # 🚪 Log out button (always visible)
         st.markdown("---")
         if st.button("🔒 Log Out", use_container_width=True):
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
+            # Back on the login form, which also deletes the login cookie
+            forget_login()
+            st.session_state.current_page = "Settings"
             st.rerun()
 
     else:
@@ -78,17 +103,6 @@ def change_database():
             st.rerun()
 
     # Route to selected page
-    if st.session_state.db_page == 'add':
-        add_game()
-    elif st.session_state.db_page == 'edit':
-        edit_game()
-    elif st.session_state.db_page == 'delete':
-        delete_game()
-    elif st.session_state.db_page == 'add_user':
-        add_user()
-    elif st.session_state.db_page == 'remove_user':
-        remove_user()
-    elif st.session_state.db_page == 'view_login_attempts':
-        view_login_attempts()
-    elif st.session_state.db_page == 'view_visits':
-        view_visits()
+    if st.session_state.db_page in DB_PAGES:
+        module_name, function_name = DB_PAGES[st.session_state.db_page]
+        getattr(importlib.import_module(module_name), function_name)()
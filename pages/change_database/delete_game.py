@@ -1,7 +1,11 @@
 import streamlit as st
 from load_data import load_games
-from firebase_config import get_firestore_db
+from storage import get_repository
+from utils.helpers import game_labels
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from metrics import traced
 
+@traced(page=True)
 def delete_game():
     """Form to delete a game"""
     st.subheader("Delete a Game")
@@ -20,16 +24,17 @@ def delete_game():
     if 'delete_status' not in st.session_state:
         st.session_state.delete_status = None
     
-    # Extract game names for the dropdown
-    game_names = [game.get('game_name', 'Unnamed Game') for game in games]
+    # Games are picked by document id, so games sharing a name can't be mixed up
+    labels = game_labels(games)
+    game_ids = list(labels)
     
     # Game selection dropdown
     selected_game = st.selectbox(
         "Select Game to Delete", 
-        options=game_names,
-        index=0 if st.session_state.delete_game_selected is None else 
-              game_names.index(st.session_state.delete_game_selected) 
-              if st.session_state.delete_game_selected in game_names else 0,
+        options=game_ids,
+        format_func=labels.get,
+        index=game_ids.index(st.session_state.delete_game_selected) 
+              if st.session_state.delete_game_selected in game_ids else 0,
         key="delete_game_selectbox"
     )
     
@@ -39,11 +44,16 @@ def delete_game():
     # Display game information and confirmation
     if selected_game:
         # Find the full game data
-        game_to_delete = next((game for game in games if game.get('game_name') == selected_game), None)
+        game_to_delete = next((game for game in games if game.get('id') == selected_game), None)
         
         if game_to_delete:
+            # Update time of the version shown, the precondition of the delete
+            loaded = st.session_state.get("delete_game_loaded")
+            if not loaded or loaded[0] != game_to_delete['id']:
+                st.session_state.delete_game_loaded = (game_to_delete['id'], game_to_delete.get('update_time'))
+
             # Display game information for confirmation
-            st.warning(f"You are about to delete: **{selected_game}**")
+            st.warning(f"You are about to delete: **{labels[selected_game]}**")
             
             # Display some details about the game
             st.info(f"Type: {game_to_delete.get('game_type', 'Not specified')}")
@@ -55,29 +65,22 @@ def delete_game():
                 # Only show delete button if checkbox is checked
                 if st.button("Delete Game", key="delete_game_button"):
                     try:
-                        # Get Firestore database
-                        db = get_firestore_db()
-                        games_ref = db.collection("games")
-                        
-                        # Query for the game document
-                        query = games_ref.where("game_name", "==", selected_game).limit(1).stream()
-                        
-                        # Find and delete the document
-                        doc_found = False
-                        for doc in query:
-                            doc.reference.delete()
-                            doc_found = True
-                            break
-                        
-                        if doc_found:
-                            # Update status in session state
-                            st.session_state.delete_status = "success"
-                            st.session_state.deleted_game_name = selected_game
-                            # Reset selection
-                            st.session_state.delete_game_selected = None
-                        else:
-                            st.session_state.delete_status = "error_not_found"
+                        # Delete the document directly, unless it changed since it was loaded
+                        get_repository().games.delete(
+                            game_to_delete['id'],
+                            last_update_time=st.session_state.delete_game_loaded[1]
+                        )
+                        # Update status in session state
+                        st.session_state.delete_status = "success"
+                        st.session_state.deleted_game_name = labels[selected_game]
+                        # Reset selection
+                        st.session_state.delete_game_selected = None
                         
+                    except FailedPrecondition:
+                        st.session_state.delete_status = "error_conflict"
+                        st.session_state.delete_game_loaded = None  # Show the latest version
+                    except NotFound:
+                        st.session_state.delete_status = "error_not_found"
                     except Exception as e:
                         st.session_state.delete_status = "error"
                         st.session_state.delete_error = str(e)
@@ -91,6 +94,11 @@ def delete_game():
             # Rerun to refresh the game list
             st.rerun()
     
+    elif st.session_state.delete_status == "error_conflict":
+        st.error("This game was changed by someone else in the meantime. Please review it before deleting.")
+        if st.button("Clear", key="clear_error_conflict"):
+            st.session_state.delete_status = None
+    
     elif st.session_state.delete_status == "error_not_found":
         st.error(f"Game not found in database. It may have been already deleted.")
         if st.button("Clear", key="clear_error_not_found"):
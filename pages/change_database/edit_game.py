@@ -1,9 +1,13 @@
 import streamlit as st
 from game_types import load_game_types
-from load_data import load_games
-from firebase_config import get_firestore_db
+from load_data import load_games, patch_game
+from storage import get_repository
+from utils.helpers import game_labels
+from google.api_core.exceptions import FailedPrecondition, NotFound
 from datetime import datetime, timezone
+from metrics import traced
 
+@traced(page=True)
 def edit_game():
     st.subheader("Edit an Existing Game")
 
@@ -20,25 +24,32 @@ def edit_game():
         st.error("No games available to edit.")
         return
 
-    game_names = [game.get('game_name', 'Unnamed Game') for game in games]
+    # Games are picked by document id, so games sharing a name can't be mixed up
+    labels = game_labels(games)
+    game_ids = list(labels)
 
     selected_game = st.selectbox(
         "Select Game to Edit",
-        options=game_names,
-        index=0 if st.session_state.edit_game_selected is None else
-              game_names.index(st.session_state.edit_game_selected)
-              if st.session_state.edit_game_selected in game_names else 0,
+        options=game_ids,
+        format_func=labels.get,
+        index=game_ids.index(st.session_state.edit_game_selected)
+              if st.session_state.edit_game_selected in game_ids else 0,
         key="edit_game_selectbox"
     )
 
     st.session_state.edit_game_selected = selected_game
 
     if selected_game:
-        game = next((game for game in games if game.get('game_name') == selected_game), None)
+        game = next((game for game in games if game.get('id') == selected_game), None)
 
         if game:
+            # Update time of the version the form was opened on, the precondition of the save
+            loaded = st.session_state.get("edit_game_loaded")
+            if not loaded or loaded[0] != game['id']:
+                st.session_state.edit_game_loaded = (game['id'], game.get('update_time'))
+
             with st.form("edit_game_form"):
-                st.subheader(f"Editing: {selected_game}")
+                st.subheader(f"Editing: {game.get('game_name', 'Unnamed Game')}")
 
                 new_game_name = st.text_input("Game Name", game.get('game_name', ''))
 
@@ -87,6 +98,8 @@ def edit_game():
                 materials_list = game.get('materials', [])
                 if isinstance(materials_list, str):
                     materials_list = [item.strip().title() for item in materials_list.split(',') if item.strip()]
+                else:
+                    materials_list = list(materials_list)  # the cached game is shared, don't mutate it
                 if game.get('game_type') == "Card Game" and "deck of cards" not in [m.lower() for m in materials_list]:
                     materials_list.append("deck of cards")
                 materials_default = ', '.join(materials_list)
@@ -138,43 +151,42 @@ def edit_game():
                             if old != new:
                                 changes[key] = {"old": old, "new": new}
 
-                        db = get_firestore_db()
-                        games_ref = db.collection("games")
-                        query = games_ref.where("game_name", "==", selected_game).limit(1).stream()
-
+                        if not changes:
+                            st.session_state.edit_status = "no_changes"
+                            st.rerun()
 
-                        # Fill in created_by and created_at if they are missing in the current game document
+                        # Fill in created_by and created_at if they are missing in the current game document,
+                        # logged like an edit so rewinding past it removes them again
                         if not game.get("created_by"):
-                            updated_game["created_by"] = st.session_state.get("username", "unknown")
+                            changes["created_by"] = {"old": None, "new": st.session_state.get("username", "unknown")}
                         if not game.get("created_at"):
-                            updated_game["created_at"] = datetime.now(timezone.utc).isoformat()
-
-                        doc_found = False
-                        for doc in query:
-                            doc.reference.update(updated_game)
-                            doc_found = True
-
-                            # Log the update to a separate collection
-                            if changes:
-                                db.collection("game_update_logs").add({
-                                    "game_id": doc.id,
-                                    "updated_by": st.session_state.get("username", "unknown"),
-                                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                                    "changes": changes
-                                })
-                            break
-
-                        if doc_found:
-                            updated_games = load_games()
-                            st.session_state.edit_game_selected = new_game_name
-                            st.session_state.games_cache = updated_games  # optional: cache
-
-                            st.session_state.edit_status = "success"
-                            st.session_state.edited_game_name = new_game_name
-                            st.rerun()  # force rerender to load fresh data
-                        else:
-                            st.session_state.edit_status = "error_not_found"
-
+                            changes["created_at"] = {"old": None, "new": datetime.now(timezone.utc).isoformat()}
+
+                        # Only the changed fields are written
+                        changed_fields = {key: change["new"] for key, change in changes.items()}
+
+                        # Fields and audit entry in one batch, failing if the game changed since it was loaded
+                        update_time, revision = get_repository().games.update_logged(
+                            game,
+                            changed_fields,
+                            st.session_state.get("username", "unknown"),
+                            changes,
+                            last_update_time=st.session_state.edit_game_loaded[1]
+                        )
+                        st.session_state.edit_game_loaded = (game['id'], update_time)
+
+                        # Patch the shared catalog from the diff instead of reloading it
+                        patch_game(game['id'], {**changed_fields, 'revision': revision}, update_time)
+
+                        st.session_state.edit_status = "success"
+                        st.session_state.edited_game_name = new_game_name
+                        st.rerun()
+
+                    except FailedPrecondition:
+                        st.session_state.edit_status = "error_conflict"
+                        st.session_state.edit_game_loaded = None  # Reopen on the latest version
+                    except NotFound:
+                        st.session_state.edit_status = "error_not_found"
                     except Exception as e:
                         st.session_state.edit_status = "error"
                         st.session_state.edit_error = str(e)
@@ -189,6 +201,18 @@ def edit_game():
             st.session_state.edited_game_name = None
             st.rerun()
 
+    elif st.session_state.edit_status == "no_changes":
+        st.info("Nothing was changed, so nothing was saved.")
+        if st.button("Clear", key="clear_edit_no_changes"):
+            st.session_state.edit_status = None
+            st.rerun()
+
+    elif st.session_state.edit_status == "error_conflict":
+        st.error("This game was changed by someone else while you were editing it. "
+                 "Your changes were not saved, please review the latest version and try again.")
+        if st.button("Clear", key="clear_edit_error_conflict"):
+            st.session_state.edit_status = None
+
     elif st.session_state.edit_status == "error_not_found":
         st.error(f"Game not found in database. It may have been deleted.")
         if st.button("Clear", key="clear_edit_error_not_found"):
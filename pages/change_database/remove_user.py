@@ -1,16 +1,16 @@
 import streamlit as st
-from firebase_config import get_firestore_db
+from user_directory import get_user_directory
+from metrics import traced
 
+@traced(page=True)
 def remove_user():
     st.subheader("Remove a User")
 
-    db = get_firestore_db()
-    users_ref = db.collection("users")
+    directory = get_user_directory()
 
     # Load all users
     try:
-        user_docs = list(users_ref.stream())
-        usernames = [doc.to_dict().get("username", "unknown") for doc in user_docs]
+        usernames = directory.usernames()
 
         if not usernames:
             st.info("No users found.")
@@ -26,11 +26,10 @@ def remove_user():
                     st.warning("Please confirm deletion before submitting.")
                 else:
                     try:
-                        for doc in user_docs:
-                            if doc.to_dict().get("username") == selected_user:
-                                doc.reference.delete()
-                                st.success(f"User '{selected_user}' deleted successfully.")
-                                st.rerun()
+                        # Deleted through its stored document id
+                        if directory.remove(selected_user):
+                            st.success(f"User '{selected_user}' deleted successfully.")
+                            st.rerun()
                         st.warning("User not found or already deleted.")
                     except Exception as e:
                         st.error(f"Error deleting user: {e}")
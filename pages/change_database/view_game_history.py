@@ -0,0 +1,108 @@
+import streamlit as st
+from datetime import datetime, time, timezone
+from load_data import load_games
+from storage import get_repository
+from utils.game_history import reconstruct_game
+from utils.helpers import game_labels
+from metrics import traced
+
+PAGE_SIZE = 20
+
+
+@traced(page=True)
+def view_game_history():
+    st.subheader("Game Edit History")
+
+    games = load_games()
+    labels = game_labels(games)
+
+    filter_by = st.radio("Show the edits of", ["A game", "An editor"], horizontal=True, key="history_filter_by")
+    game_id = updated_by = None
+    if filter_by == "A game":
+        if not labels:
+            st.info("No games available.")
+            return
+        game_id = st.selectbox("Game", list(labels), format_func=labels.get, key="history_game")
+    else:
+        updated_by = st.text_input("Editor username", key="history_editor").strip().lower()
+        if not updated_by:
+            st.info("Enter a username to see their edits.")
+            return
+
+    # Pages are read with cursors, a new filter starts again at the first page
+    current_filter = (game_id, updated_by)
+    if st.session_state.get("history_filter") != current_filter:
+        st.session_state.history_filter = current_filter
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+
+    try:
+        entries, next_cursor = get_repository().game_history.page(
+            game_id=game_id, updated_by=updated_by, page_size=PAGE_SIZE, start_after=cursors[-1]
+        )
+    except Exception as e:
+        st.error(f"Could not load the edit history: {e}")
+        return
+
+    if not entries:
+        st.info("No edits recorded.")
+    else:
+        st.dataframe([{
+            "When": _format_timestamp(entry.get("updated_at")),
+            "Editor": entry.get("updated_by", "—"),
+            "Game": labels.get(entry.get("game_id"), entry.get("game_id", "—")),
+            "Revision": entry.get("revision", "—"),
+            "Changed fields": ", ".join(entry.get("changes") or {})
+        } for entry in entries], use_container_width=True, hide_index=True)
+
+        with st.expander("Changes on this page"):
+            for entry in entries:
+                st.write(f"**{_format_timestamp(entry.get('updated_at'))}** by {entry.get('updated_by', '—')}")
+                st.json(entry.get("changes") or {}, expanded=False)
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        if st.button("← Newer", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Older →", disabled=next_cursor is None, use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+    with col3:
+        st.caption(f"Page {len(cursors)}")
+
+    if game_id:
+        show_game_at(game_id, next((game for game in games if game.get('id') == game_id), None))
+
+
+def show_game_at(game_id, current_game):
+    """Rebuild the selected game as it was at a past moment"""
+    st.markdown("---")
+    st.subheader("Game at a Past Moment")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        day = st.date_input("Date (UTC)", value=datetime.now(timezone.utc).date(), key="history_at_date")
+    with col2:
+        moment = st.time_input("Time (UTC)", value=time(12, 0), key="history_at_time")
+
+    if st.button("Show this version"):
+        at = datetime.combine(day, moment, tzinfo=timezone.utc).isoformat()
+        try:
+            game, source, replayed = reconstruct_game(get_repository().game_history, game_id, at, current_game)
+        except Exception as e:
+            st.error(f"Could not rebuild the game: {e}")
+            return
+        if game is None:
+            st.warning(f"No version available at that moment: {source}.")
+        else:
+            st.caption(f"Rebuilt from the {source}, {replayed} edit(s) applied.")
+            st.json(game)
+
+
+def _format_timestamp(raw_timestamp):
+    try:
+        return datetime.fromisoformat(raw_timestamp).strftime("%d/%m/%Y %H:%M:%S")
+    except (TypeError, ValueError):
+        return raw_timestamp or "—"
@@ -1,42 +1,86 @@
 import streamlit as st
-from firebase_config import get_firestore_db
-from datetime import datetime
+import pandas as pd
+from storage import get_repository
+from datetime import datetime, timedelta, timezone
+from metrics import traced
 
+PAGE_SIZE = 25
+SUCCESS_OPTIONS = {"All": None, "Successful": True, "Failed": False}
 
+
+@traced(page=True)
 def view_login_attempts():
     st.subheader("Login Attempt Logs")
 
-    db = get_firestore_db()
-    attempts_ref = db.collection("login_attempts")
+    today = datetime.now(timezone.utc).date()
+    col1, col2, col3 = st.columns([2, 1, 2])
+    with col1:
+        username = st.text_input("Username", key="attempts_username").strip().lower()
+    with col2:
+        outcome = st.selectbox("Outcome", list(SUCCESS_OPTIONS), key="attempts_outcome")
+    with col3:
+        date_range = st.date_input("Date range", value=(today - timedelta(days=7), today), key="attempts_dates")
+
+    if not isinstance(date_range, (list, tuple)) or len(date_range) != 2:
+        st.info("Select a start and an end date.")
+        return
+    start_date, end_date = date_range
 
-    try:
-        docs = list(attempts_ref.order_by("timestamp", direction="DESCENDING").limit(50).stream())
-        if not docs:
-            st.info("No login attempts recorded.")
+    # Pages already fetched for these filters are kept, keyed by the cursor they start after
+    current_filter = (username, outcome, start_date, end_date)
+    if st.session_state.get("attempts_filter") != current_filter:
+        st.session_state.attempts_filter = current_filter
+        st.session_state.attempts_cursors = [None]
+        st.session_state.attempts_pages = {}
+    cursors = st.session_state.attempts_cursors
+    pages = st.session_state.attempts_pages
+
+    page_number = len(cursors)
+    if page_number not in pages:
+        try:
+            pages[page_number] = get_repository().logs.login_attempts_page(
+                username=username or None,
+                success=SUCCESS_OPTIONS[outcome],
+                start_date=start_date,
+                end_date=end_date,
+                page_size=PAGE_SIZE,
+                start_after=cursors[-1]
+            )
+        except Exception as e:
+            st.error(f"Could not load login attempts: {e}")
             return
+    attempts, next_cursor = pages[page_number]
+
+    if not attempts:
+        st.info("No login attempts recorded.")
+    else:
+        data = pd.DataFrame({
+            # Parsed in one vectorized pass, formatted by the table
+            "Timestamp": pd.to_datetime(pd.Series([record.get("timestamp") for record in attempts], dtype=object),
+                                        utc=True, errors="coerce", format="ISO8601"),
+            "Username": [record.get("username", "—") for record in attempts],
+            "Success": ["✅" if record.get("success") else "❌" for record in attempts],
+            "Tries": [record.get("tries", 1) for record in attempts],
+        })
+        st.dataframe(
+            data,
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Timestamp": st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm:ss")}
+        )
 
-        st.write("Most recent login attempts:")
-
-        data = []
-        for doc in docs:
-            record = doc.to_dict()
-
-            raw_timestamp = record.get("timestamp")
-            if raw_timestamp:
-                try:
-                    dt = datetime.fromisoformat(raw_timestamp)
-                    formatted_timestamp = dt.strftime("%d/%m/%Y %H:%M:%S")
-                except ValueError:
-                    formatted_timestamp = raw_timestamp  # fallback if parsing fails
-            else:
-                formatted_timestamp = "—"
-
-            data.append({
-                "Timestamp": formatted_timestamp,
-                "Username": record.get("username", "—"),
-                "Success": "✅" if record.get("success") else "❌",
-            })
-
-        st.dataframe(data, use_container_width=True)
-    except Exception as e:
-        st.error(f"Could not load login attempts: {e}")
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
+    with col1:
+        if st.button("← Newer", disabled=page_number == 1, use_container_width=True, key="attempts_newer"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Older →", disabled=next_cursor is None, use_container_width=True, key="attempts_older"):
+            cursors.append(next_cursor)
+            st.rerun()
+    with col3:
+        if st.button("Refresh", use_container_width=True, key="attempts_refresh"):
+            st.session_state.attempts_filter = None
+            st.rerun()
+    with col4:
+        st.caption(f"Page {page_number}")
@@ -0,0 +1,53 @@
+import streamlit as st
+import pandas as pd
+from metrics import get_metrics, traced
+
+
+@traced(page=True)
+def view_performance():
+    st.subheader("Performance")
+    st.caption(
+        "Rerun latencies and Firestore operations per page, over the most recent reruns of this server "
+        "process. Reads and writes of background listeners and flushes are not counted."
+    )
+
+    metrics = get_metrics()
+    summary = metrics.summary()
+
+    if not summary["pages"]:
+        st.info("No reruns recorded yet.")
+        return
+
+    st.write("Pages:")
+    pages = pd.DataFrame(summary["pages"]).rename(columns={
+        "page": "Page",
+        "reruns": "Reruns",
+        "p50_ms": "p50 (ms)",
+        "p95_ms": "p95 (ms)",
+        "reads_per_rerun": "Reads / rerun",
+        "writes_per_rerun": "Writes / rerun",
+        "max_reads": "Max reads"
+    })
+    st.dataframe(pages.round(1), use_container_width=True, hide_index=True)
+
+    st.write("Spans:")
+    spans = pd.DataFrame(summary["spans"]).rename(columns={
+        "span": "Span",
+        "calls": "Calls",
+        "p50_ms": "p50 (ms)",
+        "p95_ms": "p95 (ms)"
+    })
+    st.dataframe(spans.round(1), use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Export now", use_container_width=True):
+            try:
+                metrics.export()
+                st.success(f"Metrics written to {metrics.path}")
+            except OSError as e:
+                st.error(f"Could not export metrics: {e}")
+    with col2:
+        if st.button("Reset", use_container_width=True):
+            metrics.reset()
+            st.rerun()
@@ -1,49 +1,50 @@
 import streamlit as st
-from firebase_config import get_firestore_db
-from datetime import datetime
+from storage import get_repository
+from utils.visit_analytics import visit_breakdowns
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+from metrics import traced
 
+DEFAULT_WINDOW_DAYS = 30
+
+
+@traced(page=True)
 def view_visits():
     st.subheader("Visitor Timeline")
 
-    db = get_firestore_db()
-    logs_ref = db.collection("visit_logs").order_by("timestamp")
-    entries = list(logs_ref.stream())
-
-    rows = []
-    for doc in entries:
-        data = doc.to_dict()
-        ts_str = data.get("timestamp")
-        try:
-            date = datetime.fromisoformat(ts_str.replace("Z", "+00:00")).date()
-        except:
-            continue
-
-        rows.append({
-            "Date": date,
-            "Username": data.get("username", "anonymous"),
-            "Admin": data.get("is_admin", False)
-        })
-
-    if not rows:
-        st.info("No visit logs found.")
+    today = datetime.now(timezone.utc).date()
+    date_range = st.date_input(
+        "Date range",
+        value=(today - timedelta(days=DEFAULT_WINDOW_DAYS - 1), today),
+        max_value=today,
+        key="visits_date_range"
+    )
+    if not isinstance(date_range, (tuple, list)) or len(date_range) != 2:
+        st.info("Select a start and an end date.")
         return
+    start_date, end_date = date_range
 
-    df = pd.DataFrame(rows)
+    # One pre-aggregated document per day in the window
+    try:
+        daily_stats = get_repository().logs.daily_visit_stats(start_date, end_date)
+    except Exception as e:
+        st.error(f"Could not load visit statistics: {e}")
+        return
 
-    # Determine full date range
-    min_date = df["Date"].min()
-    max_date = df["Date"].max()
-    all_dates = pd.date_range(start=min_date, end=max_date).date
+    if not daily_stats:
+        st.info("No visit logs found.")
+        show_maintenance()
+        return
 
-    # Count admin and user visits
-    admin_df = df[df["Admin"]].groupby("Date").size().reindex(all_dates, fill_value=0)
-    user_df = df[~df["Admin"]].groupby("Date").size().reindex(all_dates, fill_value=0)
+    all_dates = pd.date_range(start=start_date, end=end_date).date
+    df = pd.DataFrame(daily_stats)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df = df.set_index("date").reindex(all_dates).fillna(0)
 
     chart_data = pd.DataFrame({
-        "Admin Visits": admin_df,
-        "User Visits": user_df
-    })
+        "Admin Visits": df.get("admin_visits", 0),
+        "User Visits": df.get("user_visits", 0)
+    }, index=all_dates).astype(int)
 
     # Make chart scrollable horizontally
     st.markdown("### Visits Over Time (Admins vs Users)")
@@ -51,4 +52,47 @@ def view_visits():
 
     # Show exact numbers in a table
     st.markdown("### Raw Visit Counts")
-    st.dataframe(chart_data)
\ No newline at end of file
+    chart_data["Unique Sessions"] = df.get("unique_sessions", 0)
+    st.dataframe(chart_data.astype(int))
+
+    if st.checkbox("Show hourly and weekday breakdown (reads the raw visit logs of this range)", key="visits_breakdown"):
+        show_breakdowns(start_date, end_date)
+
+    show_maintenance()
+
+
+@st.cache_data(ttl=300)  # Cache for 5 minutes
+def load_breakdowns(start_date, end_date):
+    timestamps, is_admin = get_repository().logs.visit_log_window(start_date, end_date)
+    return len(timestamps), visit_breakdowns(timestamps, is_admin, start_date, end_date)
+
+
+def show_breakdowns(start_date, end_date):
+    try:
+        visit_count, breakdowns = load_breakdowns(start_date, end_date)
+    except Exception as e:
+        st.error(f"Could not load visit logs: {e}")
+        return
+
+    st.caption(f"{visit_count} raw visit logs in this range")
+
+    st.markdown("### Visits per Day (from raw logs)")
+    st.bar_chart(breakdowns["daily"])
+
+    st.markdown("### Visits per Hour of Day (UTC)")
+    st.bar_chart(breakdowns["hourly"])
+
+    st.markdown("### Weekday by Hour (UTC)")
+    st.dataframe(breakdowns["weekday_hour"], use_container_width=True)
+
+
+def show_maintenance():
+    with st.expander("Maintenance"):
+        st.write("Recompute the daily counters from the raw visit logs, e.g. for visits logged before the counters existed.")
+        if st.button("Rebuild daily visit counters", key="rebuild_visit_stats"):
+            try:
+                with st.spinner("Rebuilding..."):
+                    days = get_repository().logs.rebuild_daily_visit_stats()
+                st.success(f"Rebuilt the counters of {days} days.")
+            except Exception as e:
+                st.error(f"Could not rebuild visit counters: {e}")
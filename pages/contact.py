@@ -1,26 +1,18 @@
 import streamlit as st
-from firebase_config import get_firestore_db
-from datetime import datetime, timezone
-from google.cloud.firestore_v1 import FieldFilter
+from storage import get_repository
+from storage.repositories import SUGGESTION_DAILY_LIMIT
+from metrics import traced
 
+@traced(page=True)
 def contact():
     st.subheader("Submit Your Game Idea")
 
-    db = get_firestore_db()
+    suggestions = get_repository().suggestions
     session_id = st.session_state.get("anonymous_id", "unknown")
-    today_str = datetime.now(timezone.utc).date().isoformat()
-
-    # Check how many submissions this session made today
-    submissions_ref = db.collection("game_suggestions")
-    existing_submissions = list(
-        submissions_ref
-        .where(filter=FieldFilter("session_id", "==", session_id))
-        .where(filter=FieldFilter("date", "==", today_str))
-        .stream()
-    )
-
-    if len(existing_submissions) >= 5:
-        st.warning("You’ve reached the submission limit of 5 for today. Please try again tomorrow.")
+
+    # Check how many submissions this session made today (a single counter document)
+    if suggestions.count_today(session_id) >= SUGGESTION_DAILY_LIMIT:
+        st.warning(f"You’ve reached the submission limit of {SUGGESTION_DAILY_LIMIT} for today. Please try again tomorrow.")
         return
 
     with st.form("submit_game_form"):
@@ -36,10 +28,7 @@ def contact():
             if not idea.strip():
                 st.error("Please describe your game idea.")
             else:
-                submissions_ref.add({
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "date": today_str,
-                    "session_id": session_id,
+                suggestions.add(session_id, {
                     "name": name.strip(),
                     "email": email.strip(),
                     "game_name": game_name.strip(),
@@ -1,8 +1,10 @@
 import streamlit as st
 from login import check_login  # Import the login function from login.py
 from pages.change_database.database_manager import change_database
+from metrics import traced
 
 
+@traced(page=True)
 def settings():
     """Page for adding/updating games"""
     
@@ -1,71 +1,83 @@
+import numpy as np
 import streamlit as st
-from load_data import load_games
-
-def search_and_filter_games(games, search_term, difficulty=None, min_players=None, max_players=None, drinking_only=False):
-    filtered_games = games.copy()
-
-    if search_term:
-        search_term = search_term.lower()
-        search_results = []
-
-        for game in filtered_games:
-            if (search_term in game.get('game_name', '').lower() or
-                search_term in game.get('game_type', '').lower() or
-                search_term in game.get('game_explanation', '').lower()):
-                search_results.append(game)
-                continue
+from load_data import load_games, load_search_index, load_catalog_replica
+from utils.search_index import fold_text
+from utils.game_columns import get_game_columns
+from metrics import traced
+
+AGE_OPTIONS = ["Any", 4, 6, 8, 10, 12, 16, 18]
+DURATION_OPTIONS = ["Any", 15, 30, 45, 60, 90, 120, 180]
+PAGE_SIZE_OPTIONS = [12, 24, 48, 96]
+DEFAULT_PAGE_SIZE = 12
+# Widgets that keep their own state next to the search_term, selected_difficulty, ... values
+FILTER_WIDGET_KEYS = ("game_search", "difficulty_filter", "age_filter", "duration_filter", "player_count_filter")
+
+@traced()
+def search_and_filter_games(games, search_term, difficulty=None, min_players=None, max_players=None, drinking_only=False,
+                            search_index=None, max_age=None, max_duration=None, replica=None):
+    columns = get_game_columns(games)
+
+    if replica is not None:
+        # Text and structured predicates in one SQL query, best text matches first
+        game_ids = replica.search(
+            search_term,
+            difficulty=difficulty,
+            min_players=min_players,
+            max_players=max_players,
+            drinking_only=drinking_only,
+            max_age=max_age,
+            max_duration=max_duration
+        )
+        return [games[columns.row_of_id[game_id]] for game_id in game_ids if game_id in columns.row_of_id]
+
+    # All structured filters are evaluated as one vectorized mask
+    mask = columns.mask(
+        difficulty=difficulty,
+        min_players=min_players,
+        max_players=max_players,
+        drinking_only=drinking_only,
+        max_age=max_age,
+        max_duration=max_duration
+    )
 
-            materials = game.get('materials', [])
-            if isinstance(materials, list):
-                for material in materials:
-                    if search_term in material.lower():
-                        search_results.append(game)
-                        break
+    if search_term and search_index is not None:
+        # Posting-list lookup on the prebuilt trigram index
+        mask &= columns.rows_mask(search_index.search(search_term))
 
-        filtered_games = search_results
+    elif search_term:
+        search_term = fold_text(search_term)
+        mask &= np.array([matches_search_term(game, search_term) for game in games], dtype=bool)
 
-    if difficulty and difficulty != "All":
-        filtered_games = [game for game in filtered_games 
-                         if game.get('difficulty') == difficulty]
+    return [games[row] for row in np.flatnonzero(mask)]
 
-    if min_players is not None:
-        filtered_games = [game for game in filtered_games 
-                         if game.get('min_players', 0) <= min_players <= game.get('max_players', 999)]
 
-    if max_players is not None:
-        filtered_games = [game for game in filtered_games 
-                         if game.get('min_players', 0) <= max_players <= game.get('max_players', 999)]
+def matches_search_term(game, search_term):
+    """Linear fallback for games that are not in the search index (e.g. demo data)."""
+    if (search_term in fold_text(game.get('game_name', '')) or
+        search_term in fold_text(game.get('game_type', '')) or
+        search_term in fold_text(game.get('game_explanation', ''))):
+        return True
 
-    if drinking_only:
-        filtered_games = [
-            game for game in filtered_games
-            if ("drink" in game.get('game_explanation', '').lower())
-            or game.get('drinking_rules', '').strip()
-        ]
+    materials = game.get('materials', [])
+    if isinstance(materials, list):
+        for material in materials:
+            if search_term in fold_text(material):
+                return True
 
-    return filtered_games
+    return False
 
 
+@traced(page=True)
 def view_games():
     """Display the games database with search and filtering options"""
     st.title("Game Database")
 
-    if "view_mode" not in st.session_state:
-        st.session_state.view_mode = "list"
-
-    if "selected_game" not in st.session_state:
-        st.session_state.selected_game = None
-
     all_games = load_games()
 
     if not all_games:
         st.info("No games found in the database. Add some games to get started!")
         return
 
-    if st.session_state.view_mode == "details":
-        display_game_details(st.session_state.selected_game)
-        return
-
     # Initialize session state for filters
     if 'search_term' not in st.session_state:
         st.session_state.search_term = ""
@@ -75,7 +87,33 @@ def view_games():
         st.session_state.player_count = 4
     if 'drinking_filter' not in st.session_state:
         st.session_state.drinking_filter = False
+    if 'youngest_age' not in st.session_state:
+        st.session_state.youngest_age = "Any"
+    if 'duration_budget' not in st.session_state:
+        st.session_state.duration_budget = "Any"
+
+    game_browser(all_games)
+
+
+def clear_filters():
+    """Reset every filter and the widgets showing them"""
+    st.session_state.search_term = ""
+    st.session_state.selected_difficulty = "All"
+    st.session_state.player_count = 4
+    st.session_state.drinking_filter = False
+    st.session_state.youngest_age = "Any"
+    st.session_state.duration_budget = "Any"
+    for key in FILTER_WIDGET_KEYS:
+        st.session_state.pop(key, None)
+
 
+@st.fragment
+@traced(fragment=True)
+def game_browser(all_games):
+    """Filter panel and results, a filter change reruns only this fragment
+
+    ``all_games`` is the catalog of the last full script run.
+    """
     with st.container():
         st.subheader("Find Your Perfect Game")
 
@@ -106,11 +144,28 @@ def view_games():
             key="drinking_filter"
         )
 
-        max_players_in_games = max(
-            [game.get('max_players', 0) for game in all_games if isinstance(game.get('max_players'), (int, float))],
-            default=12
-        )
-        max_players_slider = max(12, max_players_in_games)
+        col3, col4 = st.columns(2)
+
+        with col3:
+            youngest_age = st.selectbox(
+                "Youngest player's age",
+                options=AGE_OPTIONS,
+                index=AGE_OPTIONS.index(st.session_state.youngest_age),
+                key="age_filter"
+            )
+            st.session_state.youngest_age = youngest_age
+
+        with col4:
+            duration_budget = st.selectbox(
+                "Time available (minutes)",
+                options=DURATION_OPTIONS,
+                index=DURATION_OPTIONS.index(st.session_state.duration_budget),
+                key="duration_filter"
+            )
+            st.session_state.duration_budget = duration_budget
+
+        # Computed once per catalog snapshot together with the filter columns
+        max_players_slider = get_game_columns(all_games).slider_max_players
 
         player_count = st.slider(
             "Number of Players",
@@ -121,12 +176,8 @@ def view_games():
         )
         st.session_state.player_count = player_count
 
-        if st.button("Clear Filters"):
-            st.session_state.search_term = ""
-            st.session_state.selected_difficulty = "All"
-            st.session_state.player_count = 4
-            st.session_state.drinking_filter = False
-            st.rerun()
+        # Reset in a callback, before the filter widgets are drawn again
+        st.button("Clear Filters", on_click=clear_filters)
 
     filtered_games = search_and_filter_games(
         all_games, 
@@ -134,45 +185,113 @@ def view_games():
         st.session_state.selected_difficulty if st.session_state.selected_difficulty != "All" else None,
         st.session_state.player_count,
         st.session_state.player_count,
-        st.session_state.drinking_filter
+        st.session_state.drinking_filter,
+        search_index=load_search_index(),
+        replica=load_catalog_replica(),
+        max_age=None if st.session_state.youngest_age == "Any" else st.session_state.youngest_age,
+        max_duration=None if st.session_state.duration_budget == "Any" else st.session_state.duration_budget
     )
 
     st.write(f"Found {len(filtered_games)} of {len(all_games)} games matching your criteria")
 
     if filtered_games:
-        cols = st.columns(3)
-        for i, game in enumerate(filtered_games):
-            with cols[i % 3]:
-                with st.container(border=True):
-                    st.subheader(game.get('game_name', 'Unnamed Game'))
-                    st.caption(f"Type: {game.get('game_type', 'Not specified')}")
-
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**Players:** {game.get('min_players', '-')} - {game.get('max_players', '-')}")
-                        st.write(f"{game.get('min_duration', '-')} min")
-                    with col2:
-                        st.write(f"**Difficulty:** {game.get('difficulty', 'Not specified')}")
-
-                    if st.button("View Details", key=f"view_{i}"):
-                        st.session_state.selected_game = game
-                        st.session_state.view_mode = "details"
-                        st.rerun()
+        # Go back to the first page whenever the filters change
+        current_filters = (
+            st.session_state.search_term,
+            st.session_state.selected_difficulty,
+            st.session_state.player_count,
+            st.session_state.drinking_filter,
+            st.session_state.youngest_age,
+            st.session_state.duration_budget
+        )
+        if st.session_state.get('results_filters') != current_filters:
+            st.session_state.results_filters = current_filters
+            st.session_state.results_page = 0
+
+        game_results(filtered_games)
     else:
         st.warning("No games found matching your search criteria.")
 
 
+@st.fragment
+@traced(fragment=True)
+def game_results(games):
+    """Page controls and game grid, paging reruns only this fragment"""
+    display_game_grid(paginate_games(games))
+
+
+def paginate_games(games):
+    """Show the page controls and return only the games of the current page"""
+    if 'page_size' not in st.session_state:
+        st.session_state.page_size = DEFAULT_PAGE_SIZE
+    if 'results_page' not in st.session_state:
+        st.session_state.results_page = 0
+
+    page_size = st.session_state.page_size
+    page_count = max(1, -(-len(games) // page_size))
+    page = min(st.session_state.results_page, page_count - 1)
+
+    # State changes happen in callbacks, before the controls and the grid are drawn again
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    with col1:
+        st.button("← Previous", key="previous_page", disabled=page == 0,
+                  on_click=go_to_page, args=(page - 1,))
+    with col2:
+        st.write(f"Page {page + 1} of {page_count}")
+    with col3:
+        st.button("Next →", key="next_page", disabled=page >= page_count - 1,
+                  on_click=go_to_page, args=(page + 1,))
+    with col4:
+        st.selectbox(
+            "Games per page",
+            options=PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(page_size),
+            key="page_size_select",
+            on_change=change_page_size
+        )
+
+    start = page * page_size
+    return games[start:start + page_size]
+
+
+def go_to_page(page):
+    """Switch to a page of the results"""
+    st.session_state.results_page = page
+
+
+def change_page_size():
+    """Apply the selected page size, starting again from the first page"""
+    st.session_state.page_size = st.session_state.page_size_select
+    st.session_state.results_page = 0
+
+
+def display_game_grid(games):
+    """Render the 3-column grid of game cards for the visible games only"""
+    cols = st.columns(3)
+    for i, game in enumerate(games):
+        with cols[i % 3]:
+            with st.container(border=True):
+                st.subheader(game.get('game_name', 'Unnamed Game'))
+                st.caption(f"Type: {game.get('game_type', 'Not specified')}")
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(f"**Players:** {game.get('min_players', '-')} - {game.get('max_players', '-')}")
+                    st.write(f"{game.get('min_duration', '-')} min")
+                with col2:
+                    st.write(f"**Difficulty:** {game.get('difficulty', 'Not specified')}")
+
+                # Demo games have no document id, their name is unique enough
+                game_key = game.get('id') or game.get('game_name', i)
+                if st.button("View Details", key=f"view_{game_key}"):
+                    display_game_details(game)
+
+
+@st.dialog("Game Details", width="large")
 def display_game_details(game):
-    """Display detailed information about a selected game"""
-    with st.container(border=True):
-        col1, col2 = st.columns([5, 1])
-        with col1:
-            st.header(game.get('game_name', 'Unnamed Game'))
-        with col2:
-            if st.button("← Back to Game List", key="close_details"):
-                st.session_state.view_mode = "list"
-                st.session_state.selected_game = None
-                st.rerun()
+    """Display detailed information about a selected game, over the game list"""
+    with st.container():
+        st.header(game.get('game_name', 'Unnamed Game'))
 
         st.subheader("Game Information")
 
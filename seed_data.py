@@ -3,7 +3,7 @@ Script to seed the Firebase database with sample game data.
 Run this once to populate your database.
 """
 
-from firebase_config import get_firestore_db
+from import_games import import_games
 import streamlit as st
 
 # Sample games data
@@ -29,22 +29,18 @@ SAMPLE_GAMES = [
 ]
 
 def seed_database():
-    """Seed the Firebase database with sample games data"""
+    """Seed the Firebase database with sample games data
+
+    Sample games that are already in the database are skipped, so seeding twice is harmless.
+    """
     try:
-        db = get_firestore_db()
-        games_ref = db.collection("games")
+        report = import_games(SAMPLE_GAMES, created_by="seed")
         
-        # Check if collection already has data
-        existing_games = list(games_ref.limit(1).stream())
-        if existing_games:
-            st.warning("Your database already contains game data. Skipping seeding to avoid duplicates.")
+        if not report["written"]:
+            st.warning("Your database already contains the sample games. Nothing to add.")
             return False
         
-        # Add sample games
-        for game in SAMPLE_GAMES:
-            games_ref.add(game)
-        
-        st.success(f"Successfully added {len(SAMPLE_GAMES)} sample games to the database.")
+        st.success(f"Successfully added {report['written']} sample games to the database.")
         return True
     except Exception as e:
         st.error(f"Error seeding database: {e}")
@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import streamlit as st
+from user_directory import get_user_directory
+
+TOKEN_TTL = 2 * 3600  # seconds a login is remembered
+COOKIE_NAME = "gamebase_session"
+# Logins used to be remembered in this URL parameter, it is dropped from old links
+QUERY_PARAM = "session"
+# Set on log out: this session's connection still carries the old cookie, which must not log it back in
+LOGGED_OUT_KEY = "login_forgotten"
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@st.cache_resource
+def _signing_key():
+    """``token_secret`` from the ``[auth]`` secrets or GAMEBASE_TOKEN_SECRET
+
+    Without one, a random key is used and tokens only survive until the server restarts.
+    """
+    try:
+        config = dict(st.secrets.get("auth", {}))
+    except Exception:
+        config = {}
+    secret = os.environ.get("GAMEBASE_TOKEN_SECRET", config.get("token_secret"))
+    return secret.encode() if secret else secrets.token_bytes(32)
+
+
+def _password_fingerprint(user):
+    # Ties the token to the stored hash: a removed and re-added user, or a new password, invalidates it
+    return hashlib.sha256(user.get("password_hash", "").encode()).hexdigest()[:16]
+
+
+def _client_fingerprint():
+    """Hash of the browser's User-Agent, a token copied into another browser does not verify"""
+    try:
+        user_agent = st.context.headers.get("User-Agent") or ""
+    except Exception:
+        user_agent = ""
+    return hashlib.sha256(user_agent.encode()).hexdigest()[:16]
+
+
+def _sign(payload):
+    return _b64encode(hmac.new(_signing_key(), payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user, client, now=None):
+    """Signed token remembering a login for ``TOKEN_TTL`` seconds, valid for ``client`` only"""
+    now = int(time.time() if now is None else now)
+    payload = _b64encode(json.dumps({
+        "u": user["username"],
+        "f": _password_fingerprint(user),
+        "c": client,
+        "exp": now + TOKEN_TTL
+    }, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token, client, now=None):
+    """The user a valid token was issued to, or None
+
+    The signature, the client and the expiry are checked locally. The user
+    must still be in the (cached) user directory with the same password hash,
+    so removing a user revokes their tokens, and admin rights are taken from
+    the directory.
+    """
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] < (time.time() if now is None else now):
+            return None
+        if not hmac.compare_digest(claims["c"], client):
+            return None
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+    user = get_user_directory().get(claims.get("u"))
+    if user is None or not hmac.compare_digest(claims.get("f", ""), _password_fingerprint(user)):
+        return None
+    return user
+
+
+def _set_cookie(value, max_age):
+    # Cookies can only be written by the browser; Secure is added when the app is served over https
+    st.html(
+        f"""<script>
+        document.cookie = "{COOKIE_NAME}={value}; path=/; max-age={max_age}; SameSite=Strict"
+            + (location.protocol === "https:" ? "; Secure" : "");
+        </script>""",
+        unsafe_allow_javascript=True
+    )
+
+
+def remember_login(user):
+    """Store a token for the logged in user in a cookie, so a refresh restores the login"""
+    st.session_state.pop(LOGGED_OUT_KEY, None)
+    # The token is base64url and ".", safe inside the cookie value
+    _set_cookie(issue_token(user, _client_fingerprint()), TOKEN_TTL)
+
+
+def restore_login():
+    """Restore the login of the session from the token cookie, returns True on success"""
+    if QUERY_PARAM in st.query_params:
+        del st.query_params[QUERY_PARAM]
+    if st.session_state.get(LOGGED_OUT_KEY):
+        _set_cookie("", 0)
+        return False
+    token = st.context.cookies.get(COOKIE_NAME)
+    if not token:
+        return False
+    user = verify_token(token, _client_fingerprint())
+    if user is None:
+        _set_cookie("", 0)
+        return False
+    st.session_state["logged_in"] = True
+    st.session_state["username"] = user["username"]
+    st.session_state["admin_user_rights"] = user.get("admin_user_rights", False)
+    return True
+
+
+def forget_login():
+    """Forget the remembered login on log out, call it after clearing the session state"""
+    st.session_state[LOGGED_OUT_KEY] = True
@@ -0,0 +1,60 @@
+"""
+Storage backends and the repository layer.
+
+The backend is chosen with ``backend`` in the ``[storage]`` section of
+``.streamlit/secrets.toml`` (or the ``GAMEBASE_STORAGE_BACKEND`` environment
+variable):
+
+- ``firestore`` (default): the Firebase project from ``[firebase]``
+- ``memory``: an empty in-process store, for offline runs and benchmarks
+- ``sqlite``: a local SQLite file, set with ``sqlite_path``
+"""
+
+import os
+import streamlit as st
+from storage.repositories import Repository
+from storage.metering import metered
+
+BACKENDS = ("firestore", "memory", "sqlite")
+DEFAULT_SQLITE_PATH = "data/gamebase.sqlite3"
+
+
+def storage_config():
+    """Return ``(backend, sqlite_path)`` from the secrets, overridden by environment variables"""
+    try:
+        config = dict(st.secrets.get("storage", {}))
+    except Exception:
+        # No secrets.toml at all, e.g. when running offline
+        config = {}
+    backend = os.environ.get("GAMEBASE_STORAGE_BACKEND", config.get("backend", "firestore"))
+    sqlite_path = os.environ.get("GAMEBASE_SQLITE_PATH", config.get("sqlite_path", DEFAULT_SQLITE_PATH))
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    return backend, sqlite_path
+
+
+def create_db(backend, sqlite_path=DEFAULT_SQLITE_PATH):
+    """Create a new client for the given backend"""
+    if backend == "memory":
+        from storage.memory import MemoryClient
+        return MemoryClient()
+    if backend == "sqlite":
+        from storage.sqlite import SqliteClient
+        return SqliteClient(sqlite_path)
+    from firebase_config import get_firestore_db
+    return get_firestore_db()
+
+
+@st.cache_resource
+def get_db():
+    """The document store client of the configured backend, one per process
+
+    Wrapped so the reads and writes of every rerun are counted.
+    """
+    return metered(create_db(*storage_config()))
+
+
+@st.cache_resource
+def get_repository():
+    """Repositories on top of the configured backend, one per process"""
+    return Repository(get_db())
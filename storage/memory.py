@@ -0,0 +1,508 @@
+"""
+In-memory document store with the subset of the Firestore client API used by GameBase.
+
+Collections, documents, queries, write batches, ``Increment`` / ``DELETE_FIELD`` /
+``SERVER_TIMESTAMP`` sentinels, update-time preconditions and ``on_snapshot``
+listeners behave like their Firestore counterparts, so the repositories run
+unchanged on top of it. The same engine backs the SQLite client, which only
+replaces the storage primitives at the bottom of ``MemoryClient``.
+"""
+
+import copy
+import threading
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import cmp_to_key
+from google.api_core import exceptions
+from google.cloud import firestore
+from google.cloud.firestore_v1.transforms import Increment, Sentinel
+
+StoredDocument = namedtuple("StoredDocument", ["data", "create_time", "update_time"])
+_ChangeType = namedtuple("_ChangeType", ["name"])
+DocumentChange = namedtuple("DocumentChange", ["type", "document"])
+
+ADDED, MODIFIED, REMOVED = _ChangeType("ADDED"), _ChangeType("MODIFIED"), _ChangeType("REMOVED")
+_MISSING = object()
+
+
+def _get_field(data, field_path):
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_field(data, field_path, value):
+    parts = field_path.split(".")
+    for part in parts[:-1]:
+        data = data.setdefault(part, {})
+    if value is _MISSING:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = value
+
+
+def _type_rank(value):
+    # Firestore orders values of different types by type first
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, list):
+        return 6
+    return 7
+
+
+def _sort_key(value):
+    if isinstance(value, dict):
+        return (_type_rank(value), sorted(value.items()).__repr__())
+    return (_type_rank(value), value)
+
+
+def _compare(left, right):
+    left_key, right_key = _sort_key(left), _sort_key(right)
+    return (left_key > right_key) - (left_key < right_key)
+
+
+def _matches(value, op, expected):
+    if value is _MISSING:
+        return False
+    if op == "==":
+        return value == expected
+    if op == "!=":
+        return value != expected
+    if op == "in":
+        return value in expected
+    if op == "not-in":
+        return value not in expected
+    if op == "array_contains":
+        return isinstance(value, list) and expected in value
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(item in value for item in expected)
+    if _type_rank(value) != _type_rank(expected):
+        return False
+    comparison = _compare(value, expected)
+    return {"<": comparison < 0, "<=": comparison <= 0, ">": comparison > 0, ">=": comparison >= 0}[op]
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, stored, read_time):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = stored is not None
+        self._data = stored.data if stored is not None else None
+        self.create_time = stored.create_time if stored is not None else None
+        self.update_time = stored.update_time if stored is not None else None
+        self.read_time = read_time
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self.exists else None
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class Watch:
+    """Handle returned by ``on_snapshot``, mirrors ``google.cloud.firestore_v1.watch.Watch``"""
+
+    def __init__(self, client, query, callback):
+        self._client = client
+        self._query = query
+        self._callback = callback
+        self._matched = set()
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+        self._client._remove_watch(self)
+
+    def _initial(self, read_time):
+        docs = self._query._run()
+        self._matched = {doc.id for doc in docs}
+        self._callback(docs, [DocumentChange(ADDED, doc) for doc in docs], read_time)
+
+    def _notify(self, collection, changed_ids, read_time):
+        if collection != self._query._collection:
+            return
+        docs = self._query._run()
+        by_id = {doc.id: doc for doc in docs}
+        changes = []
+        for doc_id in changed_ids:
+            if doc_id in by_id:
+                change_type = MODIFIED if doc_id in self._matched else ADDED
+                changes.append(DocumentChange(change_type, by_id[doc_id]))
+            elif doc_id in self._matched:
+                reference = self._client.collection(collection).document(doc_id)
+                changes.append(DocumentChange(REMOVED, DocumentSnapshot(reference, None, read_time)))
+        self._matched = set(by_id)
+        if changes:
+            self._callback(docs, changes, read_time)
+
+
+class Query:
+    def __init__(self, client, collection, filters=(), orders=(), limit=None, cursor=None, projection=None):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._cursor = cursor
+        self._projection = projection
+
+    def _copy(self, **changes):
+        state = {
+            "filters": self._filters, "orders": self._orders, "limit": self._limit,
+            "cursor": self._cursor, "projection": self._projection
+        }
+        state.update(changes)
+        return Query(self._client, self._collection, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=document_fields_or_snapshot)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def stream(self, transaction=None):
+        return iter(self._run())
+
+    def get(self, transaction=None):
+        return self._run()
+
+    def on_snapshot(self, callback):
+        return self._client._add_watch(self, callback)
+
+    def _cursor_values(self):
+        cursor = self._cursor
+        if isinstance(cursor, DocumentSnapshot):
+            data = cursor._data or {}
+            return [_get_field(data, field) for field, _ in self._orders], cursor.id
+        if isinstance(cursor, dict):
+            return [cursor.get(field, _MISSING) for field, _ in self._orders], None
+        return list(cursor), None
+
+    def _run(self):
+        read_time = datetime.now(timezone.utc)
+        rows = []
+        for doc_id, stored in self._client._scan(self._collection):
+            if all(_matches(_get_field(stored.data, field), op, value) for field, op, value in self._filters):
+                if all(_get_field(stored.data, field) is not _MISSING for field, _ in self._orders):
+                    rows.append((doc_id, stored))
+
+        # Ties are broken by document id, in the direction of the last ordering
+        id_direction = self._orders[-1][1] if self._orders else "ASCENDING"
+        directions = [direction for _, direction in self._orders] + [id_direction]
+
+        def compare_keys(left, right, width):
+            for position in range(width):
+                result = _compare(left[position], right[position])
+                if result:
+                    return -result if directions[position] == firestore.Query.DESCENDING else result
+            return 0
+
+        width = len(directions)
+        keyed = [([_get_field(stored.data, field) for field, _ in self._orders] + [doc_id], (doc_id, stored))
+                 for doc_id, stored in rows]
+        keyed.sort(key=lambda item: cmp_to_key(lambda a, b: compare_keys(a, b, width))(item[0]))
+
+        if self._cursor is not None:
+            values, cursor_id = self._cursor_values()
+            cursor_key = values + [cursor_id]
+            cursor_width = len(values) + (1 if cursor_id is not None else 0)
+            keyed = [(key, row) for key, row in keyed if compare_keys(key, cursor_key, cursor_width) > 0]
+
+        if self._limit is not None:
+            keyed = keyed[:self._limit]
+
+        snapshots = []
+        for _, (doc_id, stored) in keyed:
+            if self._projection is not None:
+                data = {}
+                for field in self._projection:
+                    value = _get_field(stored.data, field)
+                    if value is not _MISSING:
+                        _set_field(data, field, value)
+                stored = stored._replace(data=data)
+            reference = DocumentReference(self._client, self._collection, doc_id)
+            snapshots.append(DocumentSnapshot(reference, stored, read_time))
+        return snapshots
+
+
+class CollectionReference(Query):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        write_result = reference.create(document_data)
+        return write_result.update_time, reference
+
+    def list_documents(self):
+        return [self.document(doc_id) for doc_id, _ in self._client._scan(self._collection)]
+
+
+class DocumentReference:
+    def __init__(self, client, collection, document_id):
+        self._client = client
+        self._collection = collection
+        self.id = document_id
+        self.path = f"{collection}/{document_id}"
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self._collection)
+
+    def get(self, field_paths=None, transaction=None):
+        return DocumentSnapshot(self, self._client._read(self._collection, self.id), datetime.now(timezone.utc))
+
+    def create(self, document_data):
+        return self._client._commit([("create", self, document_data, None)])[0]
+
+    def set(self, document_data, merge=False):
+        return self._client._commit([("set_merge" if merge else "set", self, document_data, None)])[0]
+
+    def update(self, field_updates, option=None):
+        return self._client._commit([("update", self, field_updates, option)])[0]
+
+    def delete(self, option=None):
+        return self._client._commit([("delete", self, None, option)])[0]
+
+
+class WriteResult:
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def create(self, reference, document_data):
+        self._writes.append(("create", reference, document_data, None))
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("set_merge" if merge else "set", reference, document_data, None))
+
+    def update(self, reference, field_updates, option=None):
+        self._writes.append(("update", reference, field_updates, option))
+
+    def delete(self, reference, option=None):
+        self._writes.append(("delete", reference, None, option))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+    def __len__(self):
+        return len(self._writes)
+
+
+class _LastUpdateOption:
+    def __init__(self, last_update_time):
+        self._last_update_time = last_update_time
+
+
+class _ExistsOption:
+    def __init__(self, exists):
+        self._exists = exists
+
+
+class MemoryClient:
+    """Firestore-compatible client keeping every document in process memory"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._watches = []
+        self._last_time = datetime.now(timezone.utc)
+        self._collections = {}
+
+    # Public API -----------------------------------------------------------
+
+    def collection(self, name):
+        return CollectionReference(self, name)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    @staticmethod
+    def write_option(**kwargs):
+        if "last_update_time" in kwargs:
+            return _LastUpdateOption(kwargs["last_update_time"])
+        return _ExistsOption(kwargs["exists"])
+
+    def close(self):
+        pass
+
+    # Storage primitives, replaced by the SQLite client --------------------
+
+    def _read(self, collection, doc_id):
+        return self._collections.get(collection, {}).get(doc_id)
+
+    def _scan(self, collection):
+        with self._lock:
+            return list(self._collections.get(collection, {}).items())
+
+    def _store(self, collection, doc_id, stored):
+        self._collections.setdefault(collection, {})[doc_id] = stored
+
+    def _remove(self, collection, doc_id):
+        self._collections.get(collection, {}).pop(doc_id, None)
+
+    def _transaction(self):
+        """Context wrapping the storage primitives of one commit"""
+        return _NoTransaction()
+
+    # Engine ----------------------------------------------------------------
+
+    def _next_time(self):
+        now = datetime.now(timezone.utc)
+        if now <= self._last_time:
+            now = self._last_time + timedelta(microseconds=1)
+        self._last_time = now
+        return now
+
+    def _commit(self, writes):
+        with self._lock:
+            commit_time = self._next_time()
+            staged = {}
+
+            def current(reference):
+                key = (reference._collection, reference.id)
+                if key in staged:
+                    return staged[key]
+                return self._read(reference._collection, reference.id)
+
+            for kind, reference, data, option in writes:
+                existing = current(reference)
+                self._check_option(reference, existing, option)
+
+                if kind == "delete":
+                    staged[(reference._collection, reference.id)] = None
+                    continue
+                if kind == "create" and existing is not None:
+                    raise exceptions.AlreadyExists(f"Document already exists: {reference.path}")
+                if kind == "update" and existing is None:
+                    raise exceptions.NotFound(f"No document to update: {reference.path}")
+
+                if kind in ("set", "create"):
+                    base = {}
+                else:
+                    base = copy.deepcopy(existing.data) if existing is not None else {}
+                new_data = self._apply(base, data, commit_time, merge=kind == "set_merge", dotted=kind == "update")
+                create_time = existing.create_time if existing is not None else commit_time
+                staged[(reference._collection, reference.id)] = StoredDocument(new_data, create_time, commit_time)
+
+            with self._transaction():
+                for (collection, doc_id), stored in staged.items():
+                    if stored is None:
+                        self._remove(collection, doc_id)
+                    else:
+                        self._store(collection, doc_id, stored)
+
+            changed = {}
+            for collection, doc_id in staged:
+                changed.setdefault(collection, []).append(doc_id)
+            watches = list(self._watches)
+
+        # Listeners run outside the lock, like Firestore's background callbacks
+        for collection, doc_ids in changed.items():
+            for watch in watches:
+                if watch.is_active:
+                    watch._notify(collection, doc_ids, commit_time)
+        return [WriteResult(commit_time) for _ in writes]
+
+    @staticmethod
+    def _check_option(reference, existing, option):
+        if option is None:
+            return
+        if isinstance(option, _ExistsOption) or hasattr(option, "_exists"):
+            if option._exists != (existing is not None):
+                raise exceptions.FailedPrecondition(f"Exists precondition failed: {reference.path}")
+            return
+        expected = getattr(option, "_last_update_time", None)
+        if existing is None or existing.update_time != expected:
+            raise exceptions.FailedPrecondition(f"Document was modified since it was read: {reference.path}")
+
+    def _apply(self, base, data, commit_time, merge=False, dotted=False):
+        def resolve(path, value):
+            if isinstance(value, Increment):
+                old = _get_field(base, path)
+                old = old if isinstance(old, (int, float)) and not isinstance(old, bool) else 0
+                return old + value.value
+            if value is firestore.SERVER_TIMESTAMP:
+                return commit_time
+            if value is firestore.DELETE_FIELD:
+                return _MISSING
+            if isinstance(value, Sentinel):
+                raise ValueError(f"Unsupported sentinel {value!r}")
+            return copy.deepcopy(value)
+
+        def merge_into(target, values, prefix):
+            for key, value in values.items():
+                path = f"{prefix}{key}"
+                if merge and isinstance(value, dict) and isinstance(target.get(key), dict):
+                    merge_into(target[key], value, f"{path}.")
+                elif merge and isinstance(value, dict):
+                    target[key] = {}
+                    merge_into(target[key], value, f"{path}.")
+                else:
+                    resolved = resolve(path, value)
+                    if resolved is _MISSING:
+                        target.pop(key, None)
+                    else:
+                        target[key] = resolved
+
+        if dotted:
+            for path, value in data.items():
+                _set_field(base, path, resolve(path, value))
+        else:
+            merge_into(base, data, "")
+        return base
+
+    def _add_watch(self, query, callback):
+        watch = Watch(self, query, callback)
+        with self._lock:
+            self._watches.append(watch)
+        watch._initial(datetime.now(timezone.utc))
+        return watch
+
+    def _remove_watch(self, watch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+
+class _NoTransaction:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
@@ -0,0 +1,114 @@
+"""
+Metering wrapper around a document store client.
+
+Counts the reads and writes every call costs into the current rerun trace
+(see ``metrics.count_operations``) and otherwise behaves like the wrapped
+client. Queries and references built from it are wrapped too, and are
+unwrapped again when passed back into the real client (e.g. ``batch.set``).
+A query counts one read per returned document, and one when it returns
+nothing, like Firestore bills them. Listener updates arrive on background
+threads and are not counted.
+"""
+
+from metrics import count_operations
+
+# Methods returning another query or reference that must stay metered
+_CHAINED = frozenset({
+    "collection", "collection_group", "document", "where", "order_by", "limit", "limit_to_last",
+    "offset", "select", "start_at", "start_after", "end_at", "end_before"
+})
+_WRITES = frozenset({"set", "update", "delete", "create", "add"})
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Metered) else value
+
+
+class _Metered:
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+        if name in _CHAINED:
+            return lambda *args, **kwargs: _Metered(attribute(*_unwrap_all(args), **_unwrap_kwargs(kwargs)))
+        if name == "batch":
+            return lambda *args, **kwargs: _MeteredBatch(attribute(*args, **kwargs))
+        if name == "stream":
+            return lambda *args, **kwargs: _counted_stream(attribute(*args, **kwargs))
+        if name == "get":
+            return lambda *args, **kwargs: _counted_get(attribute(*args, **kwargs))
+        if name in _WRITES:
+            def write(*args, **kwargs):
+                result = attribute(*_unwrap_all(args), **_unwrap_kwargs(kwargs))
+                count_operations(writes=1)
+                return result
+            return write
+        return attribute
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+
+class _MeteredBatch:
+    """Write batch counting its writes once they are committed"""
+
+    def __init__(self, target):
+        self._target = target
+        self._staged = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name in ("set", "update", "delete", "create"):
+            def stage(*args, **kwargs):
+                result = attribute(*_unwrap_all(args), **_unwrap_kwargs(kwargs))
+                self._staged += 1
+                return result
+            return stage
+        if name == "commit":
+            def commit(*args, **kwargs):
+                result = attribute(*args, **kwargs)
+                count_operations(writes=self._staged)
+                self._staged = 0
+                return result
+            return commit
+        return attribute
+
+    def __len__(self):
+        return len(self._target)
+
+
+def _unwrap_all(args):
+    return [_unwrap(arg) for arg in args]
+
+
+def _unwrap_kwargs(kwargs):
+    return {key: _unwrap(value) for key, value in kwargs.items()}
+
+
+def _counted_stream(docs):
+    count = 0
+    for doc in docs:
+        count += 1
+        count_operations(reads=1)
+        yield doc
+    if not count:
+        count_operations(reads=1)
+
+
+def _counted_get(result):
+    if isinstance(result, list):
+        count_operations(reads=max(1, len(result)))
+    else:
+        count_operations(reads=1)
+    return result
+
+
+def metered(db):
+    """Wrap a client so its operations are counted per rerun"""
+    return _Metered(db)
@@ -0,0 +1,504 @@
+"""
+Repositories wrapping every collection GameBase reads or writes.
+
+Pages and services talk to these classes instead of building collection
+queries inline, so the same code runs on Firestore, the in-memory store and
+the SQLite store. Logs kept per session and per day live in documents with the
+deterministic id ``{session_id}_{date}`` and are written with
+``set(merge=True)`` and ``firestore.Increment``, so they need no query first.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from google.api_core.exceptions import NotFound
+from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+from utils.game_history import BOOKKEEPING_FIELDS
+
+MAX_BATCH_WRITES = 500  # Firestore limit for a single WriteBatch
+BATCH_COMMIT_WORKERS = 8  # WriteBatches committed in parallel by bulk writes
+SUGGESTION_DAILY_LIMIT = 5
+CHECKPOINT_INTERVAL = 20  # revisions between two full copies of a game in game_checkpoints
+
+
+def today_str():
+    """Today's date in ISO (YYYY-MM-DD), in UTC"""
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def session_day_id(session_id, date_str):
+    """Document id of the per-session, per-day log entries"""
+    return f"{session_id}_{date_str}"
+
+
+def user_doc_id(username):
+    """Document id of a user: the username, escaped so it is a valid Firestore id"""
+    doc_id = quote(username, safe="")
+    if not doc_id or doc_id in (".", "..") or (doc_id.startswith("__") and doc_id.endswith("__")):
+        raise ValueError(f"Invalid username '{username}'")
+    return doc_id
+
+
+def doc_to_dict(doc):
+    """Document data with the document ID added as the ``id`` field"""
+    data = doc.to_dict()
+    data['id'] = doc.id
+    return data
+
+
+class GameRepository:
+    """Games carry a server-side ``updated_at`` and deletions leave a tombstone,
+    so clients can sync only what changed since their last snapshot."""
+
+    def __init__(self, db):
+        self._db = db
+        self._games = db.collection("games")
+        self._tombstones = db.collection("game_tombstones")
+
+    def watch(self, callback, since=None):
+        """Listen to the collection, or to the games updated after ``since``
+
+        ``callback(docs, changes, read_time)`` runs on the listener thread.
+        """
+        query = self._games
+        if since is not None:
+            query = query.where(filter=FieldFilter("updated_at", ">", since))
+        return query.on_snapshot(callback)
+
+    def watch_tombstones(self, callback, since):
+        """Listen to the tombstones of games deleted after ``since``"""
+        return self._tombstones.where(filter=FieldFilter("deleted_at", ">", since)).on_snapshot(callback)
+
+    def find_by_name(self, game_name):
+        """First game with this exact name, or None"""
+        docs = self._games.where(filter=FieldFilter("game_name", "==", game_name)).limit(1).stream()
+        doc = next(docs, None)
+        return doc_to_dict(doc) if doc else None
+
+    def add(self, game):
+        _, reference = self._games.add({**game, "updated_at": firestore.SERVER_TIMESTAMP})
+        return reference.id
+
+    def list_names(self):
+        """``{document id: game_name}`` of every game, fetching only the name field"""
+        return {doc.id: doc.to_dict().get("game_name") for doc in self._games.select(["game_name"]).stream()}
+
+    def add_many(self, games_by_id, max_workers=BATCH_COMMIT_WORKERS):
+        """Write ``{document id: game}`` in WriteBatches of ``MAX_BATCH_WRITES``, committed in parallel
+
+        Documents are written with ``set``, so writing the same ids again is idempotent.
+        Returns the number of games written.
+        """
+        items = list(games_by_id.items())
+        chunks = [items[start:start + MAX_BATCH_WRITES] for start in range(0, len(items), MAX_BATCH_WRITES)]
+
+        def commit(chunk):
+            batch = self._db.batch()
+            for game_id, game in chunk:
+                batch.set(self._games.document(game_id), {**game, "updated_at": firestore.SERVER_TIMESTAMP})
+            batch.commit()
+            return len(chunk)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return sum(executor.map(commit, chunks))
+
+    def _precondition(self, last_update_time):
+        return self._db.write_option(last_update_time=last_update_time) if last_update_time else None
+
+    def delete(self, game_id, last_update_time=None):
+        """Delete a game and leave a tombstone
+
+        With ``last_update_time`` (the ``update_time`` the game was read with) the
+        delete fails with ``FailedPrecondition`` if someone changed it since.
+        """
+        batch = self._db.batch()
+        batch.delete(self._games.document(game_id), option=self._precondition(last_update_time))
+        batch.set(self._tombstones.document(game_id), {
+            "game_id": game_id,
+            "deleted_at": firestore.SERVER_TIMESTAMP
+        })
+        batch.commit()
+
+    def update_logged(self, game, fields, updated_by, changes, last_update_time=None):
+        """Write changed fields and their ``game_update_logs`` entry in one batch
+
+        ``game`` is the version being edited, ``changes`` maps each edited field
+        to ``{"old", "new"}`` and ``fields`` are the values to write. The
+        precondition works as for ``delete``. Every ``CHECKPOINT_INTERVAL``
+        revisions a full copy of the game goes into ``game_checkpoints`` in the
+        same batch, which bounds the replay needed to rebuild a past version.
+
+        Returns ``(update_time, revision)`` of the new version.
+        """
+        # Safe without a read: the precondition guarantees ``game`` is the stored version
+        revision = (game.get("revision") or 0) + 1
+        updated_at = datetime.now(timezone.utc).isoformat()
+
+        batch = self._db.batch()
+        batch.update(
+            self._games.document(game["id"]),
+            {**fields, "revision": revision, "updated_at": firestore.SERVER_TIMESTAMP},
+            option=self._precondition(last_update_time)
+        )
+        batch.set(self._db.collection("game_update_logs").document(), {
+            "game_id": game["id"],
+            "updated_by": updated_by,
+            "updated_at": updated_at,
+            "revision": revision,
+            "changes": changes
+        })
+        if revision % CHECKPOINT_INTERVAL == 0:
+            state = {key: value for key, value in {**game, **fields}.items() if key not in BOOKKEEPING_FIELDS}
+            batch.set(self._db.collection("game_checkpoints").document(f"{game['id']}_{revision:08d}"), {
+                "game_id": game["id"],
+                "revision": revision,
+                "at": updated_at,
+                "game": {**state, "revision": revision}
+            })
+        return batch.commit()[0].update_time, revision
+
+
+class GameHistoryRepository:
+    """Reads of ``game_update_logs`` and ``game_checkpoints``
+
+    Timestamps are ISO strings in UTC, as written by ``update_logged``.
+    With Firestore, the filtered and ordered queries need composite indexes on
+    (game_id, updated_at), (updated_by, updated_at) and (game_id, at).
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._logs = db.collection("game_update_logs")
+        self._checkpoints = db.collection("game_checkpoints")
+
+    def page(self, game_id=None, updated_by=None, page_size=20, start_after=None):
+        """One page of log entries, newest first
+
+        Returns ``(entries, cursor)``; pass ``cursor`` as ``start_after`` for the
+        next page. ``cursor`` is None on the last page.
+        """
+        query = self._logs
+        if game_id:
+            query = query.where(filter=FieldFilter("game_id", "==", game_id))
+        if updated_by:
+            query = query.where(filter=FieldFilter("updated_by", "==", updated_by))
+        query = query.order_by("updated_at", direction=firestore.Query.DESCENDING)
+        if start_after is not None:
+            query = query.start_after(start_after)
+
+        # One extra document tells whether there is a next page
+        docs = list(query.limit(page_size + 1).stream())
+        cursor = docs[page_size - 1] if len(docs) > page_size else None
+        return [doc_to_dict(doc) for doc in docs[:page_size]], cursor
+
+    def checkpoint_at_or_before(self, game_id, at):
+        docs = self._checkpoints \
+            .where(filter=FieldFilter("game_id", "==", game_id)) \
+            .where(filter=FieldFilter("at", "<=", at)) \
+            .order_by("at", direction=firestore.Query.DESCENDING) \
+            .limit(1) \
+            .stream()
+        doc = next(docs, None)
+        return doc.to_dict() if doc else None
+
+    def checkpoint_after(self, game_id, at):
+        docs = self._checkpoints \
+            .where(filter=FieldFilter("game_id", "==", game_id)) \
+            .where(filter=FieldFilter("at", ">", at)) \
+            .order_by("at") \
+            .limit(1) \
+            .stream()
+        doc = next(docs, None)
+        return doc.to_dict() if doc else None
+
+    def changes_between(self, game_id, after, until, descending=False):
+        """Log entries of a game with ``after < updated_at <= until`` (``after`` may be None)"""
+        query = self._logs.where(filter=FieldFilter("game_id", "==", game_id))
+        if after is not None:
+            query = query.where(filter=FieldFilter("updated_at", ">", after))
+        if until is not None:
+            query = query.where(filter=FieldFilter("updated_at", "<=", until))
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        return [doc.to_dict() for doc in query.order_by("updated_at", direction=direction).stream()]
+
+
+class GameTypeRepository:
+    def __init__(self, db):
+        self._db = db
+        self._types = db.collection("game_types")
+
+    def list_ordered(self):
+        return [doc_to_dict(doc) for doc in self._types.order_by("order").stream()]
+
+    def add(self, name, order):
+        _, reference = self._types.add({"name": name, "order": order})
+        return reference.id
+
+    def add_many(self, game_types):
+        """Add ``[{"name", "order"}, ...]`` in a single batch, returns the document ids
+
+        Types with an ``"id"`` are created under that id: the whole batch then
+        fails with ``google.api_core.exceptions.AlreadyExists`` if one of them exists.
+        """
+        batch = self._db.batch()
+        type_ids = []
+        for game_type in game_types:
+            fields = {"name": game_type["name"], "order": game_type["order"]}
+            if "id" in game_type:
+                reference = self._types.document(game_type["id"])
+                batch.create(reference, fields)
+            else:
+                reference = self._types.document()
+                batch.set(reference, fields)
+            type_ids.append(reference.id)
+        batch.commit()
+        return type_ids
+
+    def delete(self, type_id):
+        self._types.document(type_id).delete()
+
+    def reorder(self, orders):
+        """Set ``{type_id: order}`` in a single batch"""
+        batch = self._db.batch()
+        for type_id, order in orders.items():
+            batch.update(self._types.document(type_id), {"order": order})
+        batch.commit()
+
+
+class UserRepository:
+    def __init__(self, db):
+        self._db = db
+        self._users = db.collection("users")
+
+    def list_all(self):
+        return [doc_to_dict(doc) for doc in self._users.stream()]
+
+    def find_by_username(self, username):
+        """User with this username (including its document id), or None"""
+        docs = self._users.where(filter=FieldFilter("username", "==", username)).limit(1).stream()
+        doc = next(docs, None)
+        return doc_to_dict(doc) if doc else None
+
+    def add(self, username, password_hash, admin_user_rights):
+        """Create the user under the document id ``user_doc_id(username)``
+
+        The create fails with ``google.api_core.exceptions.AlreadyExists`` when
+        the username is taken, so two concurrent adds cannot both succeed.
+        """
+        reference = self._users.document(user_doc_id(username))
+        reference.create({
+            "username": username,
+            "password_hash": password_hash,
+            "admin_user_rights": admin_user_rights
+        })
+        return reference.id
+
+    def delete(self, user_id):
+        self._users.document(user_id).delete()
+
+
+class LogRepository:
+    """Login attempts, visit logs and the per-day visit rollups"""
+
+    def __init__(self, db):
+        self._db = db
+
+    def log_login_attempt(self, session_id, username, success):
+        """Upsert today's login attempt entry of the session and count the try"""
+        date_str = today_str()
+        self._db.collection("login_attempts").document(session_day_id(session_id, date_str)).set({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "username": username,
+            "success": success,
+            "session_id": session_id,
+            "date": date_str,
+            "tries": firestore.Increment(1)
+        }, merge=True)
+
+    def session_login_attempts_today(self, session_id):
+        """Today's ``{"tries", "timestamp", ...}`` entry of the session, or None; one document read"""
+        doc = self._db.collection("login_attempts").document(session_day_id(session_id, today_str())).get()
+        return doc.to_dict() if doc.exists else None
+
+    def username_login_attempts_today(self, username):
+        """``tries`` and last ``timestamp`` of today's entries whose last attempt used this username"""
+        docs = self._db.collection("login_attempts") \
+            .where(filter=FieldFilter("username", "==", username)) \
+            .where(filter=FieldFilter("date", "==", today_str())) \
+            .select(["tries", "timestamp"]) \
+            .stream()
+        return [doc.to_dict() for doc in docs]
+
+    def login_attempts_page(self, username=None, success=None, start_date=None, end_date=None,
+                            page_size=25, start_after=None):
+        """One page of login attempts, newest first, filtered in the query
+
+        ``start_date``/``end_date`` are inclusive dates. Returns ``(attempts,
+        cursor)``; pass ``cursor`` as ``start_after`` for the next page, it is
+        None on the last page. With Firestore, combining the username or success
+        filter with the timestamp order needs a composite index.
+        """
+        query = self._db.collection("login_attempts")
+        if username:
+            query = query.where(filter=FieldFilter("username", "==", username))
+        if success is not None:
+            query = query.where(filter=FieldFilter("success", "==", success))
+        if start_date is not None:
+            query = query.where(filter=FieldFilter("timestamp", ">=", start_date.isoformat()))
+        if end_date is not None:
+            query = query.where(filter=FieldFilter("timestamp", "<", (end_date + timedelta(days=1)).isoformat()))
+        query = query.order_by("timestamp", direction=firestore.Query.DESCENDING)
+        if start_after is not None:
+            query = query.start_after(start_after)
+
+        # One extra document tells whether there is a next page
+        docs = list(query.limit(page_size + 1).stream())
+        cursor = docs[page_size - 1] if len(docs) > page_size else None
+        return [doc_to_dict(doc) for doc in docs[:page_size]], cursor
+
+    def record_visits(self, visits):
+        """Create new visits and add them to the per-day rollups in one batch
+
+        ``visits`` holds at most ``MAX_BATCH_WRITES`` minus the number of days
+        they span, the rollups share the batch. Visits are keyed by session and
+        day and created, not set: when one is already stored (e.g. the commit is
+        retried after it was applied), the whole batch fails with
+        ``google.api_core.exceptions.AlreadyExists`` and no rollup is incremented twice.
+        """
+        visits_ref = self._db.collection("visit_logs")
+        batch = self._db.batch()
+        daily_counts = {}
+        for visit in visits:
+            reference = visits_ref.document(session_day_id(visit["session_id"], visit["date"]))
+            batch.create(reference, visit)
+            counts = daily_counts.setdefault(visit["date"], {"admin_visits": 0, "user_visits": 0, "unique_sessions": 0})
+            counts["admin_visits" if visit["is_admin"] else "user_visits"] += 1
+            counts["unique_sessions"] += 1
+        for date_str, counts in daily_counts.items():
+            self._add_daily_visit_counts(batch, date_str, **counts)
+        batch.commit()
+
+    def update_visit_login(self, session_id, username, is_admin, was_admin=None):
+        """Attach a login to today's visit log of the session
+
+        When the visit was counted as a user visit and the login is an admin, the
+        daily counters are moved over in the same batch. Returns False, writing
+        nothing, when the visit is not stored.
+        """
+        date_str = today_str()
+        batch = self._db.batch()
+        batch.update(self._db.collection("visit_logs").document(session_day_id(session_id, date_str)), {
+            "username": username,
+            "is_admin": is_admin
+        })
+        if was_admin is not None and was_admin != is_admin:
+            move = 1 if is_admin else -1
+            self._add_daily_visit_counts(batch, date_str, admin_visits=move, user_visits=-move)
+        try:
+            batch.commit()
+        except NotFound:
+            return False
+        return True
+
+    def _add_daily_visit_counts(self, batch, date_str, admin_visits=0, user_visits=0, unique_sessions=0):
+        counts = {
+            "admin_visits": admin_visits,
+            "user_visits": user_visits,
+            "unique_sessions": unique_sessions
+        }
+        update = {field: firestore.Increment(value) for field, value in counts.items() if value}
+        if update:
+            update["date"] = date_str
+            batch.set(self._db.collection("visit_daily_stats").document(date_str), update, merge=True)
+
+    def daily_visit_stats(self, start_date, end_date):
+        """Per-day visit rollups between two dates (inclusive), one document per day"""
+        docs = self._db.collection("visit_daily_stats") \
+            .where(filter=FieldFilter("date", ">=", start_date.isoformat())) \
+            .where(filter=FieldFilter("date", "<=", end_date.isoformat())) \
+            .order_by("date") \
+            .stream()
+        return [doc.to_dict() for doc in docs]
+
+    def visit_log_window(self, start_date, end_date):
+        """Timestamps and admin flags of the raw visit logs between two dates (inclusive)
+
+        The date range is pushed into the query and only the two fields needed
+        for the analytics are fetched.
+        """
+        docs = self._db.collection("visit_logs") \
+            .where(filter=FieldFilter("timestamp", ">=", start_date.isoformat())) \
+            .where(filter=FieldFilter("timestamp", "<", (end_date + timedelta(days=1)).isoformat())) \
+            .select(["timestamp", "is_admin"]) \
+            .stream()
+
+        timestamps, is_admin = [], []
+        for doc in docs:
+            visit = doc.to_dict()
+            timestamps.append(visit.get("timestamp"))
+            is_admin.append(bool(visit.get("is_admin", False)))
+        return timestamps, is_admin
+
+    def rebuild_daily_visit_stats(self):
+        """Recompute every rollup from the raw visit logs (backfill for logs older than the rollups)"""
+        totals = {}
+        for doc in self._db.collection("visit_logs").stream():
+            visit = doc.to_dict()
+            date_str = visit.get("date") or str(visit.get("timestamp", ""))[:10]
+            if not date_str:
+                continue
+            day = totals.setdefault(date_str, {"date": date_str, "admin_visits": 0, "user_visits": 0, "unique_sessions": 0})
+            day["admin_visits" if visit.get("is_admin") else "user_visits"] += 1
+            day["unique_sessions"] += 1
+
+        stats_ref = self._db.collection("visit_daily_stats")
+        days = list(totals.values())
+        for start in range(0, len(days), MAX_BATCH_WRITES):
+            batch = self._db.batch()
+            for day in days[start:start + MAX_BATCH_WRITES]:
+                batch.set(stats_ref.document(day["date"]), day)
+            batch.commit()
+        return len(days)
+
+
+class SuggestionRepository:
+    def __init__(self, db):
+        self._db = db
+
+    def count_today(self, session_id):
+        """Number of game suggestions the session submitted today, one document read"""
+        counter = self._db.collection("game_suggestion_counts").document(session_day_id(session_id, today_str())).get()
+        if not counter.exists:
+            return 0
+        return counter.to_dict().get("count", 0)
+
+    def add(self, session_id, suggestion):
+        """Store a game suggestion and bump the session's daily counter atomically"""
+        date_str = today_str()
+        batch = self._db.batch()
+        batch.set(self._db.collection("game_suggestions").document(), {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "date": date_str,
+            "session_id": session_id,
+            **suggestion
+        })
+        batch.set(self._db.collection("game_suggestion_counts").document(session_day_id(session_id, date_str)), {
+            "session_id": session_id,
+            "date": date_str,
+            "count": firestore.Increment(1)
+        }, merge=True)
+        batch.commit()
+
+
+class Repository:
+    """All repositories of one storage backend"""
+
+    def __init__(self, db):
+        self.db = db
+        self.games = GameRepository(db)
+        self.game_history = GameHistoryRepository(db)
+        self.game_types = GameTypeRepository(db)
+        self.users = UserRepository(db)
+        self.logs = LogRepository(db)
+        self.suggestions = SuggestionRepository(db)
@@ -0,0 +1,97 @@
+"""
+SQLite-backed variant of the in-memory document store.
+
+Documents are kept as JSON in a single table, so data survives a restart
+without Firebase credentials. Queries, batches and listeners come from the
+shared engine in ``storage.memory``.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from storage.memory import MemoryClient, StoredDocument
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in SQLite")
+
+
+def _decode(obj):
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class SqliteClient(MemoryClient):
+    """Firestore-compatible client persisting every document in a SQLite file"""
+
+    def __init__(self, path):
+        super().__init__()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                create_time TEXT NOT NULL,
+                update_time TEXT NOT NULL,
+                PRIMARY KEY (collection, id)
+            )
+        """)
+
+    def close(self):
+        self._connection.close()
+
+    def _row_to_stored(self, row):
+        data, create_time, update_time = row
+        return StoredDocument(
+            json.loads(data, object_hook=_decode),
+            datetime.fromisoformat(create_time),
+            datetime.fromisoformat(update_time)
+        )
+
+    def _read(self, collection, doc_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, create_time, update_time FROM documents WHERE collection = ? AND id = ?",
+                (collection, doc_id)
+            ).fetchone()
+        return self._row_to_stored(row) if row else None
+
+    def _scan(self, collection):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, data, create_time, update_time FROM documents WHERE collection = ?",
+                (collection,)
+            ).fetchall()
+        return [(row[0], self._row_to_stored(row[1:])) for row in rows]
+
+    def _store(self, collection, doc_id, stored):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO documents (collection, id, data, create_time, update_time) VALUES (?, ?, ?, ?, ?)",
+            (collection, doc_id, json.dumps(stored.data, default=_encode),
+             stored.create_time.isoformat(), stored.update_time.isoformat())
+        )
+
+    def _remove(self, collection, doc_id):
+        self._connection.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+
+    def _transaction(self):
+        # A batch is applied as one SQLite transaction
+        return _SqliteTransaction(self._connection)
+
+
+class _SqliteTransaction:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __enter__(self):
+        self._connection.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -1,83 +1,69 @@
 import streamlit as st
-from pages.view_games import view_games  
-from pages.settings import settings
-from pages.about import about  
-from pages.contact import contact 
 from utils.helpers import custom_header
-from firebase_config import get_firestore_db
-from datetime import datetime, timezone
+from visit_log import get_visit_recorder
+from metrics import rerun_trace
+import importlib
 import uuid
-from google.cloud.firestore_v1 import FieldFilter
 
+# Menu entry -> (module, page function). A page module is imported the first time
+# its page is shown, so visitors of the game list never load the login, bcrypt or the admin pages
+PAGES = {
+    "View Games": ("pages.view_games", "view_games"),
+    "Settings": ("pages.settings", "settings"),
+    "About": ("pages.about", "about"),
+    "Contact": ("pages.contact", "contact"),
+}
 
 
 # Page configuration
 st.set_page_config(page_title="GameBase", page_icon="🎮", layout="wide")
 
-def log_anonymous_visit():
-    db = get_firestore_db()
-    session_id = st.session_state.get("anonymous_id", "unknown")
-
-    # Today’s date in ISO (YYYY-MM-DD)
-    today_str = datetime.now(timezone.utc).date().isoformat()
-
-    # Query for existing log for this session on this day
-    existing_logs = db.collection("visit_logs") \
-        .where(filter=FieldFilter("session_id", "==", session_id)) \
-        .where(filter=FieldFilter("date", "==", today_str)) \
-        .limit(1) \
-        .stream()
-
-    if not any(existing_logs):
-        db.collection("visit_logs").add({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "session_id": session_id,
-            "date": today_str,
-            "username": st.session_state.get("username", "anonymous"),
-            "is_admin": st.session_state.get("admin_user_rights", False)
-        })
+def show_page(page):
+    """Import the module of a page (cached in sys.modules after the first time) and draw it"""
+    module_name, function_name = PAGES[page]
+    getattr(importlib.import_module(module_name), function_name)()
 
-if "anonymous_id" not in st.session_state:
-    st.session_state["anonymous_id"] = str(uuid.uuid4())
-
-log_anonymous_visit()
+def log_anonymous_visit():
+    """Record today's visit of this session, written to Firestore in the background"""
+    get_visit_recorder().record(
+        st.session_state.get("anonymous_id", "unknown"),
+        st.session_state.get("username", "anonymous"),
+        st.session_state.get("admin_user_rights", False)
+    )
 
+# Every rerun is timed and its Firestore operations are counted, see the Performance admin page
+with rerun_trace():
+    if "anonymous_id" not in st.session_state:
+        st.session_state["anonymous_id"] = str(uuid.uuid4())
 
-# Initialize the session state for page navigation
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = "View Games"
+    log_anonymous_visit()
 
-# Create two columns: one for the title and the other for the "More" dropdown
-col1, col2 = st.columns([3, 1])
 
-# Left column for the title
-with col1:
-    custom_header("GameBase")
+    # Initialize the session state for page navigation
+    if 'current_page' not in st.session_state:
+        st.session_state.current_page = "View Games"
 
-# Right column for the "More" dropdown
-with col2:
-    # Use the session state to remember the current page
-    menu = st.selectbox(
-        "More", 
-        options=["View Games", "Settings", "About", "Contact"], 
-        index=["View Games", "Settings", "About", "Contact"].index(st.session_state.current_page),
-        key="more_menu"
-    )
-    
-    # Update the current page in session state when changed
-    if menu != st.session_state.current_page:
-        st.session_state.current_page = menu
-        # Don't use st.rerun() here as it would create an infinite loop
+    # Create two columns: one for the title and the other for the "More" dropdown
+    col1, col2 = st.columns([3, 1])
 
-# Handle navigation based on the selected menu
-if menu == "Settings":
-    settings()  # Call the settings page logic
+    # Left column for the title
+    with col1:
+        custom_header("GameBase")
 
-elif menu == "About":
-    about()  # Call the about page logic
+    # Right column for the "More" dropdown
+    with col2:
+        # Use the session state to remember the current page
+        menu = st.selectbox(
+            "More", 
+            options=list(PAGES),
+            index=list(PAGES).index(st.session_state.current_page),
+            key="more_menu"
+        )
 
-elif menu == "View Games":
-    view_games()  # Call the view games page logic
+        # Update the current page in session state when changed
+        if menu != st.session_state.current_page:
+            st.session_state.current_page = menu
+            # Don't use st.rerun() here as it would create an infinite loop
 
-elif menu == "Contact":
-    contact()
\ No newline at end of file
+    # Handle navigation based on the selected menu
+    show_page(menu)
@@ -0,0 +1,70 @@
+from datetime import datetime
+import pytest
+from storage.memory import MemoryClient
+from storage.repositories import CHECKPOINT_INTERVAL, Repository
+from utils.game_history import reconstruct_game
+
+EDITS = 2 * CHECKPOINT_INTERVAL + 5
+
+
+def current_game(db, game_id):
+    doc = db.collection("games").document(game_id).get()
+    return {**doc.to_dict(), "id": game_id, "update_time": doc.update_time}
+
+
+@pytest.fixture
+def edited_game():
+    """A game edited ``EDITS`` times, with the time of each revision"""
+    db = MemoryClient()
+    repository = Repository(db)
+    game_id = repository.games.add({"game_name": "Azul", "rules": "r0", "created_at": "2000-01-01T00:00:00+00:00"})
+    for revision in range(1, EDITS + 1):
+        game = current_game(db, game_id)
+        repository.games.update_logged(game, {"rules": f"r{revision}"}, "editor",
+                                       {"rules": {"old": game["rules"], "new": f"r{revision}"}},
+                                       last_update_time=game["update_time"])
+    entries, _ = repository.game_history.page(game_id=game_id, page_size=EDITS)
+    revision_times = {entry["revision"]: entry["updated_at"] for entry in entries}
+    return repository.game_history, game_id, current_game(db, game_id), revision_times
+
+
+def test_checkpoints_are_written_every_interval(edited_game):
+    history, game_id, _, revision_times = edited_game
+    checkpoint = history.checkpoint_at_or_before(game_id, revision_times[EDITS])
+    assert checkpoint["revision"] == 2 * CHECKPOINT_INTERVAL
+    assert checkpoint["game"]["rules"] == f"r{2 * CHECKPOINT_INTERVAL}"
+
+
+@pytest.mark.parametrize("revision", [
+    1, CHECKPOINT_INTERVAL - 1, CHECKPOINT_INTERVAL, CHECKPOINT_INTERVAL + 1,
+    2 * CHECKPOINT_INTERVAL, 2 * CHECKPOINT_INTERVAL + 1, EDITS
+])
+def test_reconstruct_at_revision(edited_game, revision):
+    history, game_id, current, revision_times = edited_game
+    game, _, replayed = reconstruct_game(history, game_id, revision_times[revision], current)
+    assert game["rules"] == f"r{revision}"
+    assert replayed <= CHECKPOINT_INTERVAL
+
+
+@pytest.mark.parametrize("revision", [CHECKPOINT_INTERVAL, 2 * CHECKPOINT_INTERVAL])
+def test_reconstruct_just_before_a_checkpoint(edited_game, revision):
+    history, game_id, current, revision_times = edited_game
+    # Halfway between two revisions, the earlier one is shown
+    before, after = (datetime.fromisoformat(revision_times[r]) for r in (revision - 1, revision))
+    at = (before + (after - before) / 2).isoformat()
+    game, _, _ = reconstruct_game(history, game_id, at, current)
+    assert game["rules"] == f"r{revision - 1}"
+
+
+def test_reconstruct_before_the_first_edit(edited_game):
+    history, game_id, current, revision_times = edited_game
+    game, source, _ = reconstruct_game(history, game_id, "2010-01-01T00:00:00+00:00", current)
+    assert game["rules"] == "r0"
+    assert source == f"checkpoint of revision {CHECKPOINT_INTERVAL}"
+
+
+def test_reconstruct_before_the_game_existed(edited_game):
+    history, game_id, current, _ = edited_game
+    game, source, _ = reconstruct_game(history, game_id, "1999-01-01T00:00:00+00:00", current)
+    assert game is None
+    assert source == "the game did not exist yet"
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from login_limiter import (
+    SESSION_BURST, SESSION_REFILL, USERNAME_BURST, LoginLimiter, TokenBucket, _seeded_tokens
+)
+from storage.memory import MemoryClient
+from storage.repositories import LogRepository
+
+
+class CountingLogRepository(LogRepository):
+    """Counts the username lookups that seed new username buckets"""
+
+    username_lookups = 0
+
+    def username_login_attempts_today(self, username):
+        self.username_lookups += 1
+        return super().username_login_attempts_today(username)
+
+
+@pytest.fixture
+def logs():
+    return CountingLogRepository(MemoryClient())
+
+
+def test_bucket_allows_a_burst_then_waits_for_the_refill():
+    bucket = TokenBucket(3, 10, now=0)
+    for _ in range(3):
+        assert bucket.retry_after(0) == 0
+        bucket.take()
+    assert bucket.retry_after(0) == pytest.approx(10)
+    assert bucket.retry_after(4) == pytest.approx(6)
+    assert bucket.retry_after(10) == 0
+
+
+def test_bucket_refill_stops_at_capacity():
+    bucket = TokenBucket(3, 10, tokens=0, now=0)
+    bucket.retry_after(1000)
+    assert bucket.tokens == 3
+
+
+def test_seeded_tokens_count_todays_tries_and_the_refill_since():
+    last_attempt = (datetime.now(timezone.utc) - timedelta(seconds=2 * SESSION_REFILL)).isoformat()
+    entries = [{"tries": 3, "timestamp": last_attempt}, {"tries": 2}]
+    tokens = _seeded_tokens(entries, SESSION_BURST, SESSION_REFILL)
+    assert tokens == pytest.approx(SESSION_BURST - 5 + 2, abs=0.1)
+    assert _seeded_tokens([], SESSION_BURST, SESSION_REFILL) == SESSION_BURST
+
+
+def test_session_burst_then_throttled(logs):
+    limiter = LoginLimiter(logs)
+    assert all(limiter.admit("s1", "alice") == 0 for _ in range(SESSION_BURST))
+    assert limiter.admit("s1", "alice") > 0
+    # Another session is not affected
+    assert limiter.admit("s2", "alice") == 0
+
+
+def test_username_is_limited_across_sessions(logs):
+    limiter = LoginLimiter(logs)
+    for i in range(USERNAME_BURST):
+        assert limiter.admit(f"s{i}", "alice") == 0
+    assert limiter.admit("another", "alice") > 0
+    assert limiter.admit("another", "bob") == 0
+
+
+def test_throttled_session_does_not_look_up_usernames(logs):
+    limiter = LoginLimiter(logs)
+    for i in range(SESSION_BURST):
+        limiter.admit("s1", f"user{i}")
+    lookups = logs.username_lookups
+    assert all(limiter.admit("s1", f"other{i}") > 0 for i in range(20))
+    assert logs.username_lookups == lookups
+
+
+def test_buckets_are_seeded_from_recorded_attempts(logs):
+    for _ in range(SESSION_BURST):
+        logs.log_login_attempt("s1", "alice", False)
+    # A new limiter, as after a server restart
+    assert LoginLimiter(logs).admit("s1", "alice") > 0
@@ -0,0 +1,64 @@
+import base64
+import json
+import time
+import pytest
+import streamlit as st
+from session_tokens import TOKEN_TTL, issue_token, verify_token
+from user_directory import get_user_directory
+
+CLIENT = "browser-a"
+
+
+@pytest.fixture
+def directory(monkeypatch):
+    """A user directory on an empty in-memory store, with the user ``alice``"""
+    monkeypatch.setenv("GAMEBASE_STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("GAMEBASE_TOKEN_SECRET", "test-secret")
+    st.cache_resource.clear()
+    directory = get_user_directory()
+    directory.add("alice", "hash-1", False)
+    yield directory
+    st.cache_resource.clear()
+
+
+def test_valid_token(directory):
+    token = issue_token(directory.get("alice"), CLIENT)
+    assert verify_token(token, CLIENT)["username"] == "alice"
+
+
+def test_expired_token(directory):
+    now = time.time()
+    token = issue_token(directory.get("alice"), CLIENT, now=now)
+    assert verify_token(token, CLIENT, now=now + TOKEN_TTL - 1) is not None
+    assert verify_token(token, CLIENT, now=now + TOKEN_TTL + 1) is None
+
+
+def test_token_of_another_client(directory):
+    token = issue_token(directory.get("alice"), CLIENT)
+    assert verify_token(token, "browser-b") is None
+
+
+def test_tampered_token(directory):
+    payload, signature = issue_token(directory.get("alice"), CLIENT).split(".")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    forged = base64.urlsafe_b64encode(json.dumps({**claims, "exp": claims["exp"] + TOKEN_TTL}).encode())
+    assert verify_token(f"{forged.decode().rstrip('=')}.{signature}", CLIENT) is None
+    assert verify_token(f"{payload}.{signature[:-2]}", CLIENT) is None
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "a.b", "a.b.c", "é.é", None])
+def test_malformed_token(directory, token):
+    assert verify_token(token, CLIENT) is None
+
+
+def test_removing_the_user_revokes_the_token(directory):
+    token = issue_token(directory.get("alice"), CLIENT)
+    directory.remove("alice")
+    assert verify_token(token, CLIENT) is None
+
+
+def test_readding_the_user_revokes_the_token(directory):
+    token = issue_token(directory.get("alice"), CLIENT)
+    directory.remove("alice")
+    directory.add("alice", "hash-2", False)
+    assert verify_token(token, CLIENT) is None
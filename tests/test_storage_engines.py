@@ -0,0 +1,89 @@
+import pytest
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud import firestore
+from storage.memory import MemoryClient
+from storage.sqlite import SqliteClient
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def db(request, tmp_path):
+    client = MemoryClient() if request.param == "memory" else SqliteClient(str(tmp_path / "test.sqlite3"))
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def games(db):
+    batch = db.batch()
+    for doc_id, name, players in [("a", "Azul", 4), ("b", "Bohnanza", 7), ("c", "Carcassonne", 5),
+                                  ("d", "Dixit", 6), ("e", "Exploding Kittens", 5)]:
+        batch.set(db.collection("games").document(doc_id), {"game_name": name, "max_players": players})
+    batch.commit()
+    return db.collection("games")
+
+
+def ids(snapshots):
+    return [doc.id for doc in snapshots]
+
+
+def test_where_and_order(games):
+    query = games.where("max_players", ">=", 5).order_by("max_players", direction=firestore.Query.DESCENDING)
+    # Ties are broken by document id, in the direction of the last ordering
+    assert ids(query.get()) == ["b", "d", "e", "c"]
+
+
+def test_start_after_cursor_pages_through_ties(games):
+    query = games.order_by("max_players").limit(2)
+    first = query.get()
+    second = query.start_after(first[-1]).get()
+    third = query.start_after(second[-1]).get()
+    assert ids(first) == ["a", "c"]
+    assert ids(second) == ["e", "d"]
+    assert ids(third) == ["b"]
+
+
+def test_select_projects_fields(games):
+    doc = games.select(["game_name"]).where("game_name", "==", "Dixit").get()[0]
+    assert doc.to_dict() == {"game_name": "Dixit"}
+
+
+def test_create_existing_document_fails(games, db):
+    batch = db.batch()
+    batch.create(games.document("a"), {"game_name": "Again"})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert games.document("a").get().to_dict()["game_name"] == "Azul"
+
+
+def test_update_missing_document_fails(games, db):
+    batch = db.batch()
+    batch.update(games.document("missing"), {"game_name": "Ghost"})
+    with pytest.raises(NotFound):
+        batch.commit()
+    assert not games.document("missing").get().exists
+
+
+def test_failed_write_leaves_the_batch_unapplied(games, db):
+    batch = db.batch()
+    batch.update(games.document("a"), {"max_players": 2})
+    batch.create(games.document("b"), {"game_name": "Again"})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert games.document("a").get().to_dict()["max_players"] == 4
+
+
+def test_last_update_time_precondition(games, db):
+    read = games.document("a").get()
+    option = db.write_option(last_update_time=read.update_time)
+    games.document("a").update({"max_players": 3}, option=option)
+    # The document changed since it was read, the same precondition now fails
+    with pytest.raises(FailedPrecondition):
+        games.document("a").update({"max_players": 2}, option=option)
+    assert games.document("a").get().to_dict()["max_players"] == 3
+
+
+def test_increment(db):
+    counter = db.collection("counters").document("visits")
+    counter.set({"count": firestore.Increment(1)}, merge=True)
+    counter.set({"count": firestore.Increment(2)}, merge=True)
+    assert counter.get().to_dict() == {"count": 3}
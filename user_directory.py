@@ -0,0 +1,82 @@
+import threading
+import time
+import streamlit as st
+from google.api_core.exceptions import AlreadyExists
+from storage import get_repository
+
+# Users added or removed by another server process show up after this long
+REFRESH_INTERVAL = 300  # seconds
+
+
+class UserDirectory:
+    """Process-wide cache of the ``users`` collection, keyed by username.
+
+    The collection is read once (and again every ``REFRESH_INTERVAL`` seconds),
+    so a login or a uniqueness check is a dictionary lookup. Users added or
+    removed through the directory update the cache right away.
+    """
+
+    def __init__(self, user_repository):
+        self._users_repo = user_repository
+        self._lock = threading.Lock()
+        self._users = None
+        self._loaded_at = 0
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._users is not None and time.monotonic() - self._loaded_at < REFRESH_INTERVAL:
+                return self._users
+        users = {user.get("username"): user for user in self._users_repo.list_all() if user.get("username")}
+        with self._lock:
+            self._users = users
+            self._loaded_at = time.monotonic()
+            return self._users
+
+    def get(self, username):
+        """The user (including its document id), or None"""
+        return self._ensure_loaded().get(username)
+
+    def usernames(self):
+        return sorted(self._ensure_loaded())
+
+    def add(self, username, password_hash, admin_user_rights):
+        """Create a user, returns False when the username is already taken"""
+        if self.get(username) is not None:
+            return False
+        try:
+            user_id = self._users_repo.add(username, password_hash, admin_user_rights)
+        except AlreadyExists:
+            # Created concurrently by another session or server process
+            self.invalidate()
+            return False
+        with self._lock:
+            if self._users is not None:
+                self._users[username] = {
+                    "id": user_id,
+                    "username": username,
+                    "password_hash": password_hash,
+                    "admin_user_rights": admin_user_rights
+                }
+        return True
+
+    def remove(self, username):
+        """Delete a user by its stored document id, returns False when it is unknown"""
+        user = self.get(username)
+        if user is None:
+            return False
+        self._users_repo.delete(user["id"])
+        with self._lock:
+            if self._users is not None:
+                self._users.pop(username, None)
+        return True
+
+    def invalidate(self):
+        """Reload the collection on the next lookup"""
+        with self._lock:
+            self._users = None
+
+
+@st.cache_resource
+def get_user_directory():
+    """Create the shared user directory once per server process."""
+    return UserDirectory(get_repository().users)
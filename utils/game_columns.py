@@ -0,0 +1,103 @@
+# game_columns.py
+
+import threading
+import numpy as np
+
+# Defaults used by the filters when a game does not specify a value
+DEFAULT_MIN_PLAYERS = 0
+DEFAULT_MAX_PLAYERS = 999
+DEFAULT_SLIDER_MAX = 12
+
+
+def _numeric_column(games, field, default):
+    values = [game.get(field) for game in games]
+    return np.array(
+        [value if isinstance(value, (int, float)) and not isinstance(value, bool) else default for value in values],
+        dtype=np.float64
+    )
+
+
+def _is_drinking_game(game):
+    explanation = game.get('game_explanation') or ''
+    drinking_rules = game.get('drinking_rules') or ''
+    return "drink" in explanation.lower() or bool(drinking_rules.strip())
+
+
+class GameColumns:
+    """Numeric and categorical game fields packed into NumPy columns.
+
+    Built once per catalog snapshot, so every filter combination of a rerun is
+    evaluated as a single vectorized boolean mask instead of one Python pass
+    over the list of dicts per filter.
+    """
+
+    def __init__(self, games):
+        self.size = len(games)
+        self.min_players = _numeric_column(games, 'min_players', DEFAULT_MIN_PLAYERS)
+        self.max_players = _numeric_column(games, 'max_players', DEFAULT_MAX_PLAYERS)
+        self.min_age = _numeric_column(games, 'min_age', 0)
+        self.min_duration = _numeric_column(games, 'min_duration', 0)
+
+        self.difficulty_codes = {}
+        self.difficulty = np.array(
+            [self.difficulty_codes.setdefault(game.get('difficulty'), len(self.difficulty_codes)) for game in games],
+            dtype=np.int16
+        )
+        self.drinking = np.array([_is_drinking_game(game) for game in games], dtype=bool)
+
+        self.row_of_id = {game['id']: row for row, game in enumerate(games) if game.get('id') is not None}
+
+        # Highest numeric max_players, used as the upper bound of the player slider
+        numeric_max = [game['max_players'] for game in games
+                       if isinstance(game.get('max_players'), (int, float))]
+        self.slider_max_players = max(DEFAULT_SLIDER_MAX, int(max(numeric_max, default=DEFAULT_SLIDER_MAX)))
+
+    def mask(self, difficulty=None, min_players=None, max_players=None, drinking_only=False,
+             max_age=None, max_duration=None):
+        """Boolean mask of the games that pass every given filter."""
+        mask = np.ones(self.size, dtype=bool)
+
+        if difficulty and difficulty != "All":
+            code = self.difficulty_codes.get(difficulty)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self.difficulty == code
+
+        for player_count in (min_players, max_players):
+            if player_count is not None:
+                mask &= (self.min_players <= player_count) & (player_count <= self.max_players)
+
+        if drinking_only:
+            mask &= self.drinking
+
+        if max_age is not None:
+            # Suitable when the youngest player is at least the game's minimum age
+            mask &= self.min_age <= max_age
+
+        if max_duration is not None:
+            mask &= self.min_duration <= max_duration
+
+        return mask
+
+    def rows_mask(self, game_ids):
+        """Boolean mask selecting the rows of the given game ids."""
+        mask = np.zeros(self.size, dtype=bool)
+        rows = [self.row_of_id[game_id] for game_id in game_ids if game_id in self.row_of_id]
+        mask[rows] = True
+        return mask
+
+
+_cache_lock = threading.Lock()
+_cached = (None, None)
+
+
+def get_game_columns(games):
+    """Return the columns for ``games``, reusing them while the catalog snapshot is unchanged."""
+    global _cached
+    cached_games, cached_columns = _cached
+    if cached_games is games:
+        return cached_columns
+    columns = GameColumns(games)
+    with _cache_lock:
+        _cached = (games, columns)
+    return columns
@@ -0,0 +1,50 @@
+# game_history.py
+
+# Catalog bookkeeping that is not part of a stored game version
+BOOKKEEPING_FIELDS = ("id", "update_time", "updated_at")
+
+
+def apply_changes(game, entries, side):
+    """Apply the ``"new"`` (replaying forward) or ``"old"`` (rewinding) side of log entries to ``game``"""
+    for entry in entries:
+        for field, change in (entry.get("changes") or {}).items():
+            value = change.get(side)
+            if value is None:
+                game.pop(field, None)  # The field did not exist on that side of the edit
+            else:
+                game[field] = value
+    return game
+
+
+def reconstruct_game(history, game_id, at, current_game=None):
+    """The game as it was at ``at`` (an ISO timestamp in UTC)
+
+    Starts from the nearest checkpoint at or before ``at`` and replays the
+    later edits, otherwise rewinds the edits from the next checkpoint (or the
+    current game) back to ``at``. Checkpoints are written every
+    ``CHECKPOINT_INTERVAL`` revisions, so either way at most that many log
+    entries are read. Returns ``(game, source, replayed)``, ``game`` is None
+    when the history does not reach back that far or the game did not exist yet.
+    """
+    checkpoint = history.checkpoint_at_or_before(game_id, at)
+    if checkpoint is not None:
+        entries = history.changes_between(game_id, checkpoint["at"], at)
+        game = apply_changes(dict(checkpoint["game"]), entries, "new")
+        source = f"checkpoint of revision {checkpoint['revision']}"
+    else:
+        later = history.checkpoint_after(game_id, at)
+        if later is not None:
+            game, until = dict(later["game"]), later["at"]
+            source = f"checkpoint of revision {later['revision']}"
+        elif current_game is not None:
+            game = {key: value for key, value in current_game.items() if key not in BOOKKEEPING_FIELDS}
+            until = None
+            source = "current version"
+        else:
+            return None, "no checkpoint or current version", 0
+        entries = history.changes_between(game_id, at, until, descending=True)
+        game = apply_changes(game, entries, "old")
+
+    if isinstance(game.get("created_at"), str) and game["created_at"] > at:
+        return None, "the game did not exist yet", len(entries)
+    return game, source, len(entries)
@@ -0,0 +1,136 @@
+# game_records.py
+
+import hashlib
+import unicodedata
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+# Fields the add game form asks for, beside the bookkeeping fields
+GAME_FIELDS = (
+    'game_name', 'game_type', 'difficulty', 'min_players', 'max_players', 'min_age', 'min_duration',
+    'materials', 'game_explanation', 'rules', 'score_calculation', 'example', 'expansions',
+    'drinking_rules', 'to_be_updated', 'image_path'
+)
+REQUIRED_FIELDS = ('game_name', 'game_type', 'game_explanation')
+# Defaults of the add game form
+DEFAULT_NUMBERS = {'min_players': 2, 'max_players': 4, 'min_age': 8, 'min_duration': 30}
+MIN_DURATION_RANGE = (15, 480)
+
+
+def normalize_game_name(game_name):
+    """Name used to detect duplicates: accents, case and extra spaces are ignored"""
+    decomposed = unicodedata.normalize("NFKD", str(game_name))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def game_doc_id(game_name):
+    """Deterministic document id of a game, so re-importing it targets the same document"""
+    return "game_" + hashlib.sha1(normalize_game_name(game_name).encode("utf-8")).hexdigest()[:20]
+
+
+def _split_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def build_game_record(game_name, game_type, difficulty, min_players, max_players, min_age, min_duration,
+                      materials, game_explanation, rules="", score_calculation="", example="", expansions="",
+                      drinking_rules="", to_be_updated=None, created_at=None, created_by="unknown", image_path=""):
+    """Build the game document the way the add game form stores it
+
+    ``materials`` and ``expansions`` may be lists or comma separated strings.
+    When ``to_be_updated`` is None, a game missing a required field is flagged.
+    """
+    game = {
+        'game_name': game_name,
+        'game_type': game_type,
+        'difficulty': difficulty,
+        'min_players': min_players,
+        'max_players': max_players,
+        'min_age': min_age,
+        'min_duration': min_duration,
+        'materials': [item.title() for item in _split_list(materials)],
+        'game_explanation': game_explanation,
+        'rules': rules,
+        'score_calculation': score_calculation,
+        'example': example,
+        'expansions': [item.upper() for item in _split_list(expansions)],
+        'drinking_rules': drinking_rules,
+        'to_be_updated': to_be_updated,
+        'created_at': created_at,
+        'created_by': created_by,
+        'image_path': image_path
+    }
+    if to_be_updated is None:
+        game['to_be_updated'] = not all(game[field] for field in REQUIRED_FIELDS)
+    return game
+
+
+def _to_int(row, field, errors):
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return DEFAULT_NUMBERS[field]
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        errors.append(f"{field} is not a number: {value!r}")
+        return None
+    if not number.is_integer() or number < 0:
+        errors.append(f"{field} must be a whole number of at least 0: {value!r}")
+        return None
+    return int(number)
+
+
+def game_record_from_row(row, created_at, created_by="import"):
+    """Validate an imported row and build its game document
+
+    Returns ``(game, errors)``; ``game`` is None when the row is invalid.
+    Fields the add game form does not produce are ignored.
+    """
+    errors = []
+    game_name = str(row.get('game_name') or "").strip()
+    if not game_name:
+        errors.append("game_name is required")
+
+    difficulty = str(row.get('difficulty') or "").strip().title()
+    if difficulty not in DIFFICULTIES:
+        errors.append(f"difficulty must be one of {', '.join(DIFFICULTIES)}: {row.get('difficulty')!r}")
+
+    numbers = {field: _to_int(row, field, errors) for field in DEFAULT_NUMBERS}
+    if numbers['min_players'] is not None and numbers['min_players'] < 1:
+        errors.append("min_players must be at least 1")
+    if None not in (numbers['min_players'], numbers['max_players']) and numbers['max_players'] < numbers['min_players']:
+        errors.append("max_players must be at least min_players")
+    if numbers['min_duration'] is not None and not MIN_DURATION_RANGE[0] <= numbers['min_duration'] <= MIN_DURATION_RANGE[1]:
+        errors.append(f"min_duration must be between {MIN_DURATION_RANGE[0]} and {MIN_DURATION_RANGE[1]} minutes")
+
+    if errors:
+        return None, errors
+
+    text = {field: str(row.get(field) or "").strip() for field in (
+        'game_type', 'game_explanation', 'rules', 'score_calculation', 'example', 'drinking_rules', 'image_path'
+    )}
+    to_be_updated = row.get('to_be_updated')
+    if isinstance(to_be_updated, str) and not to_be_updated.strip():
+        to_be_updated = None
+    game = build_game_record(
+        game_name=game_name,
+        difficulty=difficulty,
+        materials=row.get('materials'),
+        expansions=row.get('expansions'),
+        to_be_updated=None if to_be_updated is None else _to_bool(to_be_updated),
+        created_at=created_at,
+        created_by=created_by,
+        **numbers,
+        **text
+    )
+    return game, []
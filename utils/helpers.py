@@ -1,7 +1,6 @@
 # helpers.py
 
 import streamlit as st
-import pandas as pd
 
 def format_game_duration(duration):
     """Format the game duration to be more readable."""
@@ -13,4 +12,21 @@ def format_game_duration(duration):
 def custom_header(title: str):
     """Display a custom header with the game icon."""
     st.title(f"🎮 {title}")
-    st.markdown("---")
\ No newline at end of file
+    st.markdown("---")
+
+def game_labels(games):
+    """``{document id: label}`` for game pickers, games sharing a name get their type and id appended"""
+    name_counts = {}
+    for game in games:
+        name = game.get('game_name', 'Unnamed Game')
+        name_counts[name] = name_counts.get(name, 0) + 1
+
+    labels = {}
+    for game in games:
+        if not game.get('id'):
+            continue  # Demo games have no document to write to
+        name = game.get('game_name', 'Unnamed Game')
+        if name_counts[name] > 1:
+            name = f"{name} ({game.get('game_type', '?')}, {game['id'].removeprefix('game_')[:6]})"
+        labels[game['id']] = name
+    return labels
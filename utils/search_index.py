@@ -0,0 +1,88 @@
+# search_index.py
+
+import threading
+import unicodedata
+from collections import defaultdict
+
+# Text fields covered by the search box, materials are added per item
+SEARCH_FIELDS = ('game_name', 'game_type', 'game_explanation')
+GRAM_SIZE = 3
+
+
+def fold_text(text):
+    """Lowercase and strip accents, so "Pétanque" and "petanque" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _game_texts(game):
+    """Folded searchable values of a game, one entry per field or material."""
+    texts = [fold_text(game.get(field) or '') for field in SEARCH_FIELDS]
+    materials = game.get('materials', [])
+    if isinstance(materials, list):
+        texts.extend(fold_text(material) for material in materials if isinstance(material, str))
+    return tuple(text for text in texts if text)
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class GameSearchIndex:
+    """Trigram inverted index over the searchable text of every game.
+
+    A search term of three or more characters is answered by intersecting the
+    posting lists of its trigrams and confirming the (few) candidates, instead
+    of lowercasing every field of every game on each rerun. Shorter terms are
+    matched against the pre-folded texts. The index follows the game catalog
+    through ``update``, so only added, edited or removed games are reindexed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = {}
+        self._postings = defaultdict(set)
+
+    def update(self, upserts, removed_ids, full=False):
+        """Apply catalog changes, ``full`` replaces the whole index."""
+        with self._lock:
+            if full:
+                self._texts = {}
+                self._postings = defaultdict(set)
+            for game_id in removed_ids:
+                self._remove(game_id)
+            for game in upserts:
+                game_id = game.get('id')
+                if game_id is None:
+                    continue
+                self._remove(game_id)
+                texts = _game_texts(game)
+                self._texts[game_id] = texts
+                for text in texts:
+                    for gram in _grams(text):
+                        self._postings[gram].add(game_id)
+
+    def _remove(self, game_id):
+        texts = self._texts.pop(game_id, ())
+        for text in texts:
+            for gram in _grams(text):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(game_id)
+                    if not posting:
+                        del self._postings[gram]
+
+    def search(self, term):
+        """Return the ids of the games with ``term`` in one of their searchable fields."""
+        term = fold_text(term)
+        with self._lock:
+            grams = _grams(term)
+            if grams:
+                postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+                candidates = set.intersection(*postings)
+            else:
+                candidates = self._texts.keys()
+            return {
+                game_id for game_id in candidates
+                if any(term in text for text in self._texts[game_id])
+            }
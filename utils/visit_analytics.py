@@ -0,0 +1,49 @@
+# visit_analytics.py
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def parse_timestamps(raw_timestamps):
+    """Parse ISO timestamps in one vectorized pass, unparseable values become NaT"""
+    return pd.to_datetime(pd.Series(raw_timestamps, dtype=object), utc=True, errors="coerce", format="ISO8601")
+
+
+def visit_breakdowns(raw_timestamps, is_admin, start_date, end_date):
+    """Daily, hourly and weekday-by-hour visit counts between two dates (inclusive).
+
+    Every breakdown is a ``np.bincount`` over integer bucket indices, so the cost
+    is a few array passes regardless of how many visits are in the window.
+    """
+    timestamps = parse_timestamps(raw_timestamps)
+    is_admin = np.asarray(is_admin, dtype=bool)
+
+    all_dates = pd.date_range(start=start_date, end=end_date).date
+    start = pd.Timestamp(start_date, tz="UTC")
+
+    valid = timestamps.notna().to_numpy().copy()
+    day = ((timestamps - start) // pd.Timedelta(days=1)).to_numpy(dtype=float, na_value=-1)
+    valid &= (day >= 0) & (day < len(all_dates))
+
+    day = day[valid].astype(np.int64)
+    admin = is_admin[valid]
+    hour = timestamps.dt.hour.to_numpy(dtype=float, na_value=0)[valid].astype(np.int64)
+    weekday = timestamps.dt.weekday.to_numpy(dtype=float, na_value=0)[valid].astype(np.int64)
+
+    daily = pd.DataFrame({
+        "Admin Visits": np.bincount(day[admin], minlength=len(all_dates)),
+        "User Visits": np.bincount(day[~admin], minlength=len(all_dates))
+    }, index=all_dates)
+
+    hourly = pd.Series(np.bincount(hour, minlength=24), index=range(24), name="Visits")
+    hourly.index.name = "Hour (UTC)"
+
+    weekday_hour = pd.DataFrame(
+        np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24),
+        index=WEEKDAYS,
+        columns=range(24)
+    )
+
+    return {"daily": daily, "hourly": hourly, "weekday_hour": weekday_hour}
@@ -0,0 +1,162 @@
+import atexit
+import threading
+from datetime import datetime, timezone
+import streamlit as st
+from google.api_core.exceptions import AlreadyExists
+from storage import get_repository
+from storage.repositories import MAX_BATCH_WRITES
+
+FLUSH_SIZE = 100  # pending visits that trigger an early flush
+FLUSH_INTERVAL = 5  # seconds between background flushes
+# Visits per WriteBatch, leaving room for the daily rollup writes
+CHUNK_SIZE = MAX_BATCH_WRITES - 100
+
+
+class VisitRecorder:
+    """Write-behind recorder for ``visit_logs`` shared by every session of the process.
+
+    Each (session_id, date) pair is recorded once, deduplicated in memory, so a
+    rerun costs no Firestore read. New visits are buffered and written by a
+    background thread in ``WriteBatch`` commits, either every ``FLUSH_INTERVAL``
+    seconds or as soon as ``FLUSH_SIZE`` visits are pending. The per-day rollups
+    in ``visit_daily_stats`` are incremented in the same batch. Pending visits are
+    flushed when the process shuts down.
+    """
+
+    def __init__(self, log_repository):
+        self._logs = log_repository
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._seen_date = None
+        self._seen = {}
+        self._pending = {}
+        # Visits being committed, and logins that arrived meanwhile, applied once the commit is done
+        self._in_flight = {}
+        self._deferred_logins = {}
+        self._thread = threading.Thread(target=self._run, name="visit-log-flusher", daemon=True)
+        self._thread.start()
+
+    def record(self, session_id, username, is_admin):
+        """Buffer a visit unless this session was already recorded today."""
+        now = datetime.now(timezone.utc)
+        today_str = now.date().isoformat()
+        key = (session_id, today_str)
+
+        with self._lock:
+            if self._seen_date != today_str:
+                # Only today's sessions can be seen again, forget older ones
+                self._seen_date = today_str
+                self._seen = {}
+            if key in self._seen:
+                return False
+            self._seen[key] = is_admin
+            self._pending[key] = {
+                "timestamp": now.isoformat(),
+                "session_id": session_id,
+                "date": today_str,
+                "username": username,
+                "is_admin": is_admin
+            }
+            if len(self._pending) >= FLUSH_SIZE:
+                self._wake.set()
+        return True
+
+    def mark_login(self, session_id, username, is_admin):
+        """Attach a login to today's visit of the session.
+
+        A visit that is still buffered is updated in memory, one being written
+        is updated after its commit, otherwise the stored visit and the daily
+        rollup are updated directly.
+        """
+        key = (session_id, datetime.now(timezone.utc).date().isoformat())
+        with self._lock:
+            was_admin = self._seen.get(key)
+            self._seen[key] = is_admin
+            visit = self._pending.get(key)
+            if visit is not None:
+                visit["username"] = username
+                visit["is_admin"] = is_admin
+                return
+            if key in self._in_flight:
+                self._deferred_logins[key] = (username, is_admin)
+                return
+        self._logs.update_visit_login(session_id, username, is_admin, was_admin=was_admin)
+
+    def flush(self):
+        """Write all pending visits, keeping them buffered if a commit fails."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._in_flight.update(pending)
+        if not pending:
+            return
+
+        items = list(pending.items())
+        for start in range(0, len(items), CHUNK_SIZE):
+            chunk = items[start:start + CHUNK_SIZE]
+            try:
+                try:
+                    self._logs.record_visits([visit for _, visit in chunk])
+                    written = {key for key, _ in chunk}
+                except AlreadyExists:
+                    # Some visits are stored already, e.g. this commit was applied before
+                    # an error: write them one by one, so each one is counted once
+                    written = set()
+                    for key, visit in chunk:
+                        try:
+                            self._logs.record_visits([visit])
+                            written.add(key)
+                        except AlreadyExists:
+                            pass
+            except Exception as e:
+                print(f"Could not flush visit logs: {e}")
+                self._requeue(items[start:])
+                return
+            self._finish(chunk, written)
+
+    def _requeue(self, items):
+        with self._lock:
+            for key, visit in items:
+                self._in_flight.pop(key, None)
+                login = self._deferred_logins.pop(key, None)
+                if login is not None:
+                    visit["username"], visit["is_admin"] = login
+                self._pending.setdefault(key, visit)
+
+    def _finish(self, chunk, written):
+        """Apply the logins that arrived while ``chunk`` was being committed"""
+        logins = []
+        with self._lock:
+            for key, visit in chunk:
+                self._in_flight.pop(key, None)
+                login = self._deferred_logins.pop(key, None)
+                if login is not None:
+                    # Counted with the committed is_admin; a visit stored before is left as it is
+                    was_admin = visit["is_admin"] if key in written else None
+                    logins.append((key, login, was_admin))
+        for (session_id, _), (username, is_admin), was_admin in logins:
+            try:
+                self._logs.update_visit_login(session_id, username, is_admin, was_admin=was_admin)
+            except Exception as e:
+                print(f"Could not attach a login to visit {session_id}: {e}")
+
+    def close(self):
+        """Stop the background thread and write what is still pending."""
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=FLUSH_INTERVAL)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+
+@st.cache_resource
+def get_visit_recorder():
+    """Create the process-wide visit recorder, flushed again at interpreter exit."""
+    recorder = VisitRecorder(get_repository().logs)
+    atexit.register(recorder.close)
+    return recorder
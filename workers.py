@@ -0,0 +1,53 @@
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import streamlit as st
+
+# bcrypt releases the GIL, so its threads really use cores; leave some for the sessions
+BCRYPT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+BCRYPT_TIMEOUT = 30  # seconds a login waits for its password check
+TASK_WORKERS = 4  # threads running fire-and-forget tasks such as login logging
+
+
+@st.cache_resource
+def get_bcrypt_pool():
+    """Bounded pool for password hashing, shared by every session of the process."""
+    return ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+
+@st.cache_resource
+def get_task_pool():
+    """Pool for background tasks whose result the page does not wait for."""
+    return ThreadPoolExecutor(max_workers=TASK_WORKERS, thread_name_prefix="background-task")
+
+
+def verify_password(password, password_hash):
+    """Check a password against its bcrypt hash on the bcrypt pool"""
+    future = get_bcrypt_pool().submit(bcrypt.checkpw, password.encode(), password_hash.encode())
+    return future.result(timeout=BCRYPT_TIMEOUT)
+
+
+def hash_password(password):
+    """bcrypt hash of a password, computed on the bcrypt pool"""
+    future = get_bcrypt_pool().submit(bcrypt.hashpw, password.encode(), bcrypt.gensalt())
+    return future.result(timeout=BCRYPT_TIMEOUT).decode()
+
+
+def _report_failure(future):
+    error = future.exception()
+    if error is not None:
+        print("Background task failed:")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+
+def run_in_background(function, *args, **kwargs):
+    """Run ``function`` on the task pool without waiting for it
+
+    The task runs outside the script thread, so it must not touch
+    ``st.session_state`` or call Streamlit elements: read what it needs before
+    submitting. Failures are printed to the server log.
+    """
+    future = get_task_pool().submit(function, *args, **kwargs)
+    future.add_done_callback(_report_failure)
+    return future